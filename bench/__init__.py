@@ -0,0 +1,10 @@
+"""
+Offline benchmark suite for the VaultCore API.
+
+Seeds a synthetic catalog into a throwaway SQLite database, drives every route in-process through the
+ASGI interface and writes throughput, latency percentiles and SQL statements per request to a JSON file.
+
+    python -m bench run --techs 2000 --projects 10000 --output bench_results.json
+    python -m bench compare before.json after.json
+    python -m bench import-time --budget main=1.5 --budget cli=0.8
+"""
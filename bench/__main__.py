@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+import tempfile
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Offline benchmark suite for the VaultCore API.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Seed a throwaway database and benchmark every route.")
+    run_parser.add_argument("--techs", type=int, default=2000)
+    run_parser.add_argument("--projects", type=int, default=10000)
+    run_parser.add_argument("--links-per-project", type=int, default=5)
+    run_parser.add_argument("--users", type=int, default=1000)
+    run_parser.add_argument("--refresh-tokens", type=int, default=20000)
+    run_parser.add_argument("--requests", type=int, default=200, help="Requests per route (fewer for costly routes).")
+    run_parser.add_argument("--bcrypt-rounds", type=int, default=4,
+                            help="Cost for seeded and newly hashed passwords, kept low so logins don't dominate.")
+    run_parser.add_argument("--only", action="append", help="Only run scenarios containing this text (repeatable).")
+    run_parser.add_argument("--output", default="bench_results.json")
+
+    compare_parser = commands.add_parser("compare", help="Show the change between two result files.")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+
+    import_parser = commands.add_parser("import-time", help="Check the import time of main and cli against a budget.")
+    import_parser.add_argument("--budget", action="append", default=[], metavar="MODULE=RATIO",
+                               help="Override or add a budget as a multiple of the reference import time, "
+                                    "e.g. --budget main=1.5 (repeatable).")
+    import_parser.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        from bench.runner import compare
+        compare(args.before, args.after)
+        return
+
+    if args.command == "import-time":
+        from bench.import_time import DEFAULT_BUDGETS, check_budgets
+        budgets = dict(DEFAULT_BUDGETS)
+        for item in args.budget:
+            module, _, ms = item.partition("=")
+            budgets[module] = float(ms)
+        if not check_budgets(budgets, args.repeat):
+            sys.exit(1)
+        return
+
+    if args.users < 2:
+        parser.error("--users must be at least 2")
+
+    # The app reads its configuration at import time, so point it at a fresh database first.
+    workdir = tempfile.mkdtemp(prefix="vaultcore-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    os.environ.setdefault("JWT_SECRET_KEY", "vaultcore-bench-secret-key-not-for-production")
+    os.environ.setdefault("DB_ECHO", "false")
+    # Every scenario logs in and registers from the same client; measure the limiter, not its rejections
+    for name in ("AUTH_LOGIN_RATE_PER_IP", "AUTH_LOGIN_RATE_PER_USERNAME", "AUTH_REGISTER_RATE_PER_IP"):
+        os.environ.setdefault(name, "1000000/1")
+
+    from bench.runner import run
+    run(args.output, techs=args.techs, projects=args.projects, links_per_project=args.links_per_project,
+        users=args.users, refresh_tokens=args.refresh_tokens, requests=args.requests,
+        bcrypt_rounds=args.bcrypt_rounds, only=args.only)
+    print(f"Benchmark database kept in {workdir}")
+
+
+if __name__ == "__main__":
+    main()
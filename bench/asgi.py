@@ -0,0 +1,75 @@
+import asyncio
+import json as jsonlib
+from urllib.parse import urlsplit
+
+
+class ASGIResponse:
+    def __init__(self, status: int, headers: list[tuple[bytes, bytes]], body: bytes):
+        self.status_code = status
+        self.headers = {key.decode().lower(): value.decode() for key, value in headers}
+        self.content = body
+
+    def json(self):
+        return jsonlib.loads(self.content)
+
+
+async def asgi_request(app, method: str, path: str, json=None, headers: dict | None = None,
+                       content: bytes | None = None) -> ASGIResponse:
+    """
+    Send a single HTTP request to an ASGI app in-process and collect the whole response.
+
+    The body is `json` encoded, or the raw `content` bytes.
+    """
+    url = urlsplit(path)
+    body = jsonlib.dumps(json).encode() if json is not None else content or b""
+    raw_headers = [(b"host", b"bench"), (b"content-length", str(len(body)).encode())]
+    if json is not None:
+        raw_headers.append((b"content-type", b"application/json"))
+    for key, value in (headers or {}).items():
+        raw_headers.append((key.lower().encode(), value.encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    request_sent = False
+    status = 500
+    response_headers: list[tuple[bytes, bytes]] = []
+    chunks: list[bytes] = []
+    response_complete = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Streaming responses watch for a disconnect, so only report one once the response is done
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, response_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        response_complete.set()
+    return ASGIResponse(status, response_headers, b"".join(chunks))
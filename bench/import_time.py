@@ -0,0 +1,50 @@
+import re
+import subprocess
+import sys
+
+# Import time budgets as multiples of importing the frameworks themselves, so they hold on slow and fast
+# machines alike. main may take at most twice as long as FastAPI plus SQLAlchemy's ORM; cli must not pull
+# in FastAPI, so it has to stay clearly below that.
+REFERENCE_IMPORT = "fastapi, sqlalchemy.orm"
+DEFAULT_BUDGETS = {"main": 2.0, "cli": 0.9}
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\S+)$")
+
+
+def measure_import_ms(modules: str, repeat: int = 5) -> float:
+    """
+    Best cumulative time of `import <modules>` over `repeat` fresh interpreters, from `python -X importtime`.
+
+    Adds up the top-level entries of the named modules and of their parent packages.
+    """
+    names = {name.strip() for name in modules.split(",")}
+    counted = {".".join(name.split(".")[:depth]) for name in names for depth in range(1, name.count(".") + 2)}
+    best = float("inf")
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modules}"],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {modules} failed:\n{result.stderr[-2000:]}")
+        elapsed = 0
+        for line in result.stderr.splitlines():
+            match = _IMPORTTIME_LINE.match(line)
+            if match and match.group(2) in counted:
+                elapsed += int(match.group(1))
+        best = min(best, elapsed / 1000)
+    return best
+
+
+def check_budgets(budgets: dict[str, float], repeat: int = 5, reference: str = REFERENCE_IMPORT) -> bool:
+    """
+    Print the import time of each module against its budget and return whether all of them fit.
+    """
+    reference_ms = measure_import_ms(reference, repeat)
+    print(f"{'reference':<20} {reference_ms:>8.1f}ms  (import {reference})")
+    ok = True
+    for module, budget in budgets.items():
+        elapsed = measure_import_ms(module, repeat)
+        ratio = elapsed / reference_ms
+        within = ratio <= budget
+        ok = ok and within
+        print(f"{module:<20} {elapsed:>8.1f}ms = {ratio:.2f}x / {budget:.2f}x  {'ok' if within else 'OVER BUDGET'}")
+    return ok
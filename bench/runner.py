@@ -0,0 +1,287 @@
+import asyncio
+import json
+import platform
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy import event, func, insert, select
+
+from bench.asgi import asgi_request
+from bench.seed import BENCH_ADMIN, BENCH_PASSWORD, seed_catalog
+from src.models import CatalogChange, Project, RefreshToken, Tech, User
+
+
+class Scenario:
+    """
+    One route to benchmark: `build(i)` returns the i-th request as a dict with path, json and headers.
+
+    Requests are built outside the timed section, so any setup SQL they run isn't counted.
+    """
+
+    def __init__(self, method: str, route: str, build: Callable[[int], dict], divisor: int = 1):
+        self.method = method
+        self.route = route
+        self.build = build
+        self.divisor = divisor  # expensive routes (bcrypt, bulk, streaming) run requests // divisor times
+
+    @property
+    def key(self) -> str:
+        return f"{self.method} {self.route}"
+
+
+class StatementCounter:
+    def __init__(self, *engines):
+        self.value = 0
+        for engine in set(engines):
+            event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args, **kwargs):
+        self.value += 1
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def build_scenarios(engine, sizes: dict, admin_headers: dict) -> list[Scenario]:
+    from src.security import create_access_token, create_refresh_token
+
+    techs, projects, users = sizes["techs"], sizes["projects"], sizes["users"]
+
+    def tech_id(i: int) -> int:
+        return i * 7919 % techs + 1
+
+    def project_id(i: int) -> int:
+        return i * 7919 % projects + 1
+
+    def disposable(model, prefix: str) -> Callable[[int], int]:
+        def create(i: int) -> int:
+            with engine.begin() as conn:
+                return conn.execute(insert(model).values(name=f"{prefix}-{i}").returning(*model.__mapper__.primary_key)
+                                    ).scalar_one()
+        return create
+
+    disposable_tech = disposable(Tech, "bench-disposable-tech")
+    disposable_project = disposable(Project, "bench-disposable-project")
+
+    def fresh_refresh_token(i: int) -> str:
+        token, row = create_refresh_token(1)
+        with engine.begin() as conn:
+            conn.execute(insert(RefreshToken), [row])
+        return token
+
+    def recent_version(i: int) -> int:
+        # A client polling after the last 100 catalog changes
+        with engine.connect() as conn:
+            return max(0, conn.execute(select(func.max(CatalogChange.version))).scalar_one() - 100)
+
+    def import_body(i: int) -> bytes:
+        # 100 new projects, each linked to two existing techs by name
+        with engine.connect() as conn:
+            names = conn.execute(select(Tech.name).where(Tech.tech_id.in_([tech_id(i), tech_id(i + 1)]))).scalars().all()
+        records = []
+        for k in range(100):
+            project = f"bench-import-{i}-{k}"
+            records.append({"type": "project", "name": project})
+            records.extend({"type": "link", "project": project, "tech": name} for name in names)
+        return "".join(json.dumps(record) + "\n" for record in records).encode()
+
+    def user_token(i: int) -> dict:
+        user_id = i % (users - 1) + 2
+        with engine.connect() as conn:
+            role, version = conn.execute(select(User.role, User.token_version).where(User.user_id == user_id)).one()
+        return {"Authorization": f"Bearer {create_access_token(user_id, role=role, token_version=version)}"}
+
+    return [
+        # Auth
+        Scenario("POST", "/auth/register", lambda i: {"path": "/auth/register", "json": {
+            "username": f"bench-register-{i}", "password": BENCH_PASSWORD, "email": f"register-{i}@bench.example.com"}},
+            divisor=10),
+        Scenario("POST", "/auth/login", lambda i: {"path": "/auth/login", "json": {
+            "username": BENCH_ADMIN, "password": BENCH_PASSWORD}}, divisor=10),
+        Scenario("POST", "/auth/refresh", lambda i: {"path": "/auth/refresh", "json": {
+            "refresh_token": fresh_refresh_token(i)}}),
+        Scenario("POST", "/auth/logout", lambda i: {"path": "/auth/logout", "headers": user_token(i)}),
+        # Techs
+        Scenario("POST", "/techs/", lambda i: {"path": "/techs/", "json": {
+            "name": f"bench-tech-{i}", "description": "benchmark"}, "headers": admin_headers}),
+        Scenario("POST", "/techs/bulk", lambda i: {"path": "/techs/bulk?on_conflict=update", "json": [
+            {"name": f"bench-bulk-tech-{i}-{j}"} for j in range(1000)], "headers": admin_headers}, divisor=20),
+        Scenario("GET", "/techs/", lambda i: {"path": f"/techs/?limit=100&after={tech_id(i) // 2}"}),
+        Scenario("GET", "/techs/?stream=true", lambda i: {"path": "/techs/?stream=true"}, divisor=20),
+        Scenario("GET", "/techs/popular", lambda i: {"path": "/techs/popular?limit=10"}),
+        Scenario("GET", "/techs/{tech_id}", lambda i: {"path": f"/techs/{tech_id(i)}"}),
+        Scenario("GET", "/techs/{tech_id}/projects", lambda i: {"path": f"/techs/{tech_id(i)}/projects?limit=50"}),
+        Scenario("PATCH", "/techs/{tech_id}", lambda i: {"path": f"/techs/{tech_id(i)}", "json": {
+            "description": f"updated {i}"}, "headers": admin_headers}),
+        Scenario("DELETE", "/techs/{tech_id}", lambda i: {"path": f"/techs/{disposable_tech(i)}",
+                                                         "headers": admin_headers}),
+        # Projects
+        Scenario("POST", "/projects/", lambda i: {"path": "/projects/", "json": {
+            "name": f"bench-project-{i}", "description": "benchmark"}, "headers": admin_headers}),
+        Scenario("POST", "/projects/bulk", lambda i: {"path": "/projects/bulk?on_conflict=update", "json": [
+            {"name": f"bench-bulk-project-{i}-{j}"} for j in range(1000)], "headers": admin_headers}, divisor=20),
+        Scenario("GET", "/projects/", lambda i: {"path": f"/projects/?limit=100&after={project_id(i) // 2}"}),
+        Scenario("GET", "/projects/?limit=1000", lambda i: {"path": f"/projects/?limit=1000&after={project_id(i) // 2}"},
+                 divisor=5),
+        Scenario("GET", "/projects/?fields=", lambda i: {
+            "path": f"/projects/?limit=1000&fields=name&after={project_id(i) // 2}"}, divisor=5),
+        Scenario("GET", "/projects/?tech=", lambda i: {
+            "path": f"/projects/?limit=100&match=any&tech={tech_id(i)}&tech={tech_id(i + 1)}"}),
+        Scenario("GET", "/projects/?stream=true", lambda i: {"path": "/projects/?stream=true"}, divisor=20),
+        Scenario("GET", "/projects/facets", lambda i: {"path": f"/projects/facets?tech={tech_id(i)}"}),
+        Scenario("GET", "/projects/{project_id}", lambda i: {"path": f"/projects/{project_id(i)}"}),
+        Scenario("PATCH", "/projects/{project_id}", lambda i: {"path": f"/projects/{project_id(i)}", "json": {
+            "description": f"updated {i}"}, "headers": admin_headers}),
+        Scenario("PUT", "/projects/{project_id}/techs", lambda i: {
+            "path": f"/projects/{project_id(i)}/techs?mode={('add', 'remove', 'replace')[i % 3]}",
+            "json": [tech_id(i + k) for k in range(5)], "headers": admin_headers}),
+        Scenario("DELETE", "/projects/{project_id}", lambda i: {"path": f"/projects/{disposable_project(i)}",
+                                                               "headers": admin_headers}),
+        # Search
+        Scenario("GET", "/search", lambda i: {"path": f"/search?q={('data', 'cache stream', 'vec', 'web api')[i % 4]}"}),
+        # Catalog export / import
+        Scenario("GET", "/export", lambda i: {"path": "/export", "headers": admin_headers}, divisor=50),
+        Scenario("POST", "/import", lambda i: {"path": "/import", "content": import_body(i), "headers": admin_headers}),
+        # Delta sync
+        Scenario("GET", "/changes", lambda i: {"path": f"/changes?since={recent_version(i)}"}),
+        Scenario("GET", "/changes?stream=true", lambda i: {"path": "/changes?stream=true"}, divisor=20),
+    ]
+
+
+async def _run_scenario(app, scenario: Scenario, requests: int, counter: StatementCounter) -> dict:
+    count = max(1, requests // scenario.divisor)
+    latencies, statements, response_bytes = [], 0, 0
+    statuses = Counter()
+
+    for i in range(count):
+        request = scenario.build(i)
+        counter.value = 0
+        started = time.perf_counter()
+        response = await asgi_request(app, scenario.method, request["path"], json=request.get("json"),
+                                      headers=request.get("headers"), content=request.get("content"))
+        latencies.append(time.perf_counter() - started)
+        statements += counter.value
+        response_bytes += len(response.content)
+        statuses[str(response.status_code)] += 1
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "requests": count,
+        "throughput_rps": round(count / total, 2) if total else None,
+        "mean_ms": round(total / count * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "sql_per_request": round(statements / count, 2),
+        "bytes_per_response": round(response_bytes / count),
+        "status_codes": dict(statuses),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(techs: int, projects: int, links_per_project: int, users: int, refresh_tokens: int,
+                        requests: int, bcrypt_rounds: int, only: list[str] | None = None) -> dict:
+    """
+    Seed the catalog, start the app and benchmark every scenario, returning the full report.
+    """
+    from main import app
+    from src.database import get_engine, get_read_engine, init_db
+
+    engine = get_engine()
+    init_db()
+
+    seeding_started = time.perf_counter()
+    sizes = seed_catalog(engine, techs, projects, links_per_project, users, refresh_tokens, bcrypt_rounds)
+    seeding_seconds = time.perf_counter() - seeding_started
+    counter = StatementCounter(engine, get_read_engine())  # GET routes run on the read-only engine
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        login = await asgi_request(app, "POST", "/auth/login",
+                                   json={"username": BENCH_ADMIN, "password": BENCH_PASSWORD})
+        if login.status_code != 200:
+            raise RuntimeError(f"Benchmark admin login failed: {login.status_code} {login.content!r}")
+        admin_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        scenarios = build_scenarios(engine, sizes, admin_headers)
+        for scenario in scenarios:
+            if only and not any(pattern in scenario.key for pattern in only):
+                continue
+            results[scenario.key] = await _run_scenario(app, scenario, requests, counter)
+            print(f"{scenario.key:<40} p50={results[scenario.key]['p50_ms']:>9.3f}ms "
+                  f"p99={results[scenario.key]['p99_ms']:>9.3f}ms sql={results[scenario.key]['sql_per_request']}")
+
+        covered = {(s.method, s.route.split("?")[0]) for s in scenarios}
+        uncovered = sorted(
+            f"{method.upper()} {path}"
+            for path, operations in app.openapi()["paths"].items()
+            for method in operations
+            if (method.upper(), path) not in covered
+        )
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seeded": sizes,
+            "seeding_seconds": round(seeding_seconds, 3),
+            "requests_per_scenario": requests,
+            "bcrypt_rounds": bcrypt_rounds,
+            "uncovered_routes": uncovered,
+        },
+        "results": results,
+    }
+
+
+def run(output: str, **options) -> dict:
+    report = asyncio.run(run_benchmark(**options))
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    if report["meta"]["uncovered_routes"]:
+        print(f"Routes without a scenario: {', '.join(report['meta']['uncovered_routes'])}")
+    print(f"Results written to {output}")
+    return report
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """
+    Print per-route latency and throughput changes between two result files.
+    """
+    with open(before_path) as f:
+        before = json.load(f)["results"]
+    with open(after_path) as f:
+        after = json.load(f)["results"]
+
+    def change(old, new) -> str:
+        if not old or new is None:
+            return "n/a"
+        return f"{(new - old) / old * 100:+.1f}%"
+
+    print(f"{'route':<40} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>9} {'sql/req':>12}")
+    for key in sorted(set(before) | set(after)):
+        old, new = before.get(key), after.get(key)
+        if not old or not new:
+            print(f"{key:<40} {'only in ' + ('after' if new else 'before'):>9}")
+            continue
+        print(f"{key:<40} {change(old['p50_ms'], new['p50_ms']):>9} {change(old['p95_ms'], new['p95_ms']):>9} "
+              f"{change(old['p99_ms'], new['p99_ms']):>9} {change(old['throughput_rps'], new['throughput_rps']):>9} "
+              f"{old['sql_per_request']:>5} -> {new['sql_per_request']:<5}")
@@ -0,0 +1,76 @@
+import hashlib
+import random
+from datetime import datetime, timedelta, timezone
+
+import bcrypt
+from sqlalchemy import insert
+
+from src.models import Project, RefreshToken, Tech, User, UserRole, project_techs
+
+BENCH_ADMIN = "bench-admin"
+BENCH_PASSWORD = "bench-password"
+INSERT_CHUNK = 10_000
+
+WORDS = ("api", "async", "cache", "cloud", "data", "engine", "graph", "index", "kernel", "lambda", "mesh",
+         "native", "queue", "runtime", "schema", "stream", "vector", "web", "worker", "zero")
+
+
+def _insert_chunked(conn, table, rows: list[dict]) -> None:
+    for i in range(0, len(rows), INSERT_CHUNK):
+        conn.execute(insert(table), rows[i:i + INSERT_CHUNK])
+
+
+def _description(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12)))
+
+
+def seed_catalog(engine, techs: int, projects: int, links_per_project: int, users: int, refresh_tokens: int,
+                 bcrypt_rounds: int, seed: int = 0) -> dict:
+    """
+    Fill an empty database with a reproducible synthetic catalog and return the sizes that were seeded.
+
+    Every user shares one password hash so seeding doesn't pay for thousands of bcrypt rounds.
+    """
+    rng = random.Random(seed)
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode(), bcrypt.gensalt(bcrypt_rounds)).decode()
+    now = datetime.now(timezone.utc)
+    links_per_project = min(links_per_project, techs)
+
+    with engine.begin() as conn:
+        _insert_chunked(conn, Tech.__table__, [
+            {"tech_id": i, "name": f"tech-{i}", "description": _description(rng)} for i in range(1, techs + 1)
+        ])
+        _insert_chunked(conn, Project.__table__, [
+            {"project_id": i, "name": f"project-{i}", "description": _description(rng)}
+            for i in range(1, projects + 1)
+        ])
+        _insert_chunked(conn, project_techs, [
+            {"project_id": project_id, "tech_id": tech_id}
+            for project_id in range(1, projects + 1)
+            for tech_id in rng.sample(range(1, techs + 1), links_per_project)
+        ])
+
+        _insert_chunked(conn, User.__table__, [
+            {"user_id": 1, "username": BENCH_ADMIN, "password_hash": password_hash,
+             "email": "admin@bench.example.com", "role": UserRole.ADMIN},
+        ] + [
+            {"user_id": i, "username": f"user-{i}", "password_hash": password_hash,
+             "email": f"user-{i}@bench.example.com", "role": UserRole.EDITOR if i % 10 == 0 else UserRole.USER}
+            for i in range(2, users + 2)
+        ])
+        _insert_chunked(conn, RefreshToken.__table__, [
+            {"user_id": rng.randint(1, users + 1),
+             "token": hashlib.sha256(f"bench-refresh-{i}".encode()).digest(),
+             "created_at": now - timedelta(days=rng.randint(0, 90)),
+             "expires_at": now + timedelta(days=rng.randint(-60, 3)),
+             "active": rng.random() < 0.2}
+            for i in range(refresh_tokens)
+        ])
+
+    return {
+        "techs": techs,
+        "projects": projects,
+        "links": projects * links_per_project,
+        "users": users + 1,
+        "refresh_tokens": refresh_tokens,
+    }
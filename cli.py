@@ -1,17 +1,26 @@
 import sys
-from src.commands import create_admin, create_editor
-from src.database import Session
+from src.commands import (bulk_create_users, create_admin, create_editor, purge_refresh_tokens, rebuild_change_log,
+                          rebuild_search_index, rebuild_tech_counts, upgrade_refresh_tokens)
+from src.database import Session, init_db
+from src.security import calibrate_bcrypt_rounds
 
 
 def main():
     if len(sys.argv) < 2:
         print("Usage: python cli.py <command> [<args>]")
-        print("Available commands: 'create-admin', 'create-editor'")
+        print("Available commands: 'init-db', 'create-admin', 'create-editor',"
+              " 'bulk-create-users <file.csv|file.jsonl> [batch_size]', 'purge-refresh-tokens [batch_size]',"
+              " 'upgrade-refresh-tokens', 'rebuild-search-index', 'rebuild-change-log', 'rebuild-tech-counts',"
+              " 'calibrate-bcrypt-rounds <target_ms>'")
         return
 
     command = sys.argv[1]
 
-    if command == "create-admin":
+    if command == "init-db":
+        upgrades = init_db()
+        print(f"Database schema is up to date{' after: ' + ', '.join(upgrades) if upgrades else ''}")
+
+    elif command == "create-admin":
         db = Session()
         try:
             create_admin(db)
@@ -25,6 +34,63 @@ def main():
         finally:
             db.close()
 
+    elif command == "bulk-create-users":
+        if len(sys.argv) < 3:
+            print("Usage: python cli.py bulk-create-users <file.csv|file.jsonl> [batch_size]")
+            return
+        db = Session()
+        try:
+            if len(sys.argv) > 3:
+                bulk_create_users(db, sys.argv[2], batch_size=int(sys.argv[3]))
+            else:
+                bulk_create_users(db, sys.argv[2])
+        finally:
+            db.close()
+
+    elif command == "purge-refresh-tokens":
+        db = Session()
+        try:
+            if len(sys.argv) > 2:
+                purge_refresh_tokens(db, batch_size=int(sys.argv[2]))
+            else:
+                purge_refresh_tokens(db)
+        finally:
+            db.close()
+
+    elif command == "upgrade-refresh-tokens":
+        db = Session()
+        try:
+            upgrade_refresh_tokens(db)
+        finally:
+            db.close()
+
+    elif command == "rebuild-search-index":
+        db = Session()
+        try:
+            rebuild_search_index(db)
+        finally:
+            db.close()
+
+    elif command == "rebuild-change-log":
+        db = Session()
+        try:
+            rebuild_change_log(db)
+        finally:
+            db.close()
+
+    elif command == "rebuild-tech-counts":
+        db = Session()
+        try:
+            rebuild_tech_counts(db)
+        finally:
+            db.close()
+
+    elif command == "calibrate-bcrypt-rounds":
+        if len(sys.argv) < 3:
+            print("Usage: python cli.py calibrate-bcrypt-rounds <target_ms>")
+            return
+        print(f"BCRYPT_ROUNDS={calibrate_bcrypt_rounds(float(sys.argv[2]))}")
+
     else:
         print(f"{command} is not a valid command.")
 
@@ -1,9 +1,52 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from src.routers import auth, projects, techs
+from src.database import DB_ASYNC, DB_CREATE_SCHEMA, describe_engine, dispose_engines, init_db
+from src.metrics import METRICS_ENABLED, MetricsMiddleware
+from src.routers import auth, catalog, changes, metrics, projects, search, techs
+from src.security import get_bcrypt_rounds, get_fake_password_hash, get_token_secret_key
+from src.writes import write_pipeline
+
+logger = logging.getLogger("uvicorn.error")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fail at startup rather than on the first login if the signing key is missing
+    get_token_secret_key()
+    logger.info(describe_engine())
+    if DB_CREATE_SCHEMA:
+        init_db()
+    # Calibrate the bcrypt cost and build the timing dummy before serving logins
+    get_bcrypt_rounds()
+    get_fake_password_hash()
+    yield
+    write_pipeline.close()
+    await dispose_engines()
+
+
+def create_app() -> FastAPI:
+    """
+    Build the API application. The database is only touched once its lifespan starts.
+    """
+    app = FastAPI(title="VaultCore API", lifespan=lifespan)
 
-app = FastAPI(title="VaultCore API")
+    app.include_router(auth.auth_router, tags=["Auth"])
+    if DB_ASYNC:
+        # Registered first so they take precedence over the sync routes they replace
+        from src.routers import async_projects, async_techs
+        app.include_router(async_techs.async_techs_router, tags=["Techs"])
+        app.include_router(async_projects.async_project_router, tags=["Projects"])
+    app.include_router(techs.techs_router, tags=["Techs"])
+    app.include_router(projects.project_router, tags=["Projects"])
+    app.include_router(search.search_router, tags=["Search"])
+    app.include_router(changes.changes_router, tags=["Changes"])
+    app.include_router(catalog.catalog_router, tags=["Catalog"])
+    if METRICS_ENABLED:
+        app.include_router(metrics.metrics_router)
+        app.add_middleware(MetricsMiddleware)
+    return app
 
-app.include_router(auth.auth_router, tags=["Auth"])
-app.include_router(techs.techs_router, tags=["Techs"])
-app.include_router(projects.project_router, tags=["Projects"])
 
+app = create_app()
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Hashable
+
+ENTITY_CACHE_MAX_ENTRIES = int(os.getenv("ENTITY_CACHE_MAX_ENTRIES", "10000"))
+ENTITY_CACHE_MAX_BYTES = int(os.getenv("ENTITY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+ENTITY_CACHE_TTL_SECONDS = float(os.getenv("ENTITY_CACHE_TTL_SECONDS", "60"))
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Build a strong ETag from a serialized payload.
+    """
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check an If-None-Match header value against an ETag (weak comparison, as RFC 9110 requires).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+# Invalidations held back on this thread, see deferred_invalidation()
+_deferred = threading.local()
+
+@contextmanager
+def deferred_invalidation():
+    """
+    Hold back the cache invalidations made on this thread until the block exits.
+
+    For writes whose commit happens later, e.g. in a group commit: invalidating before the commit would
+    let a concurrent read put the old row back into the cache.
+    """
+    pending = _deferred.pending = []
+    try:
+        yield
+    finally:
+        _deferred.pending = None
+        for invalidate, *args in pending:
+            invalidate(*args)
+
+
+class EntityCache:
+    """
+    Thread-safe LRU cache of serialized entities with a TTL and a bound on the total payload size.
+
+    Entries are (body, etag) pairs. Every invalidation bumps a generation counter so that a read
+    that started before a write can't put its stale result back into the cache.
+    """
+
+    def __init__(self, max_entries: int = ENTITY_CACHE_MAX_ENTRIES, max_bytes: int = ENTITY_CACHE_MAX_BYTES,
+                 ttl: float = ENTITY_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[bytes, str, float]] = OrderedDict()
+        self._size = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> tuple[bytes, str] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            body, etag, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return body, etag
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], bytes | None]) -> tuple[bytes, str] | None:
+        """
+        Return the cached entry for `key`, calling `loader` to serialize the entity on a miss.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+
+        generation = self._generation
+        return self._put(key, loader(), generation)
+
+    async def aget_or_load(self, key: Hashable,
+                           loader: Callable[[], Awaitable[bytes | None]]) -> tuple[bytes, str] | None:
+        """
+        Async variant of get_or_load for loaders running on an AsyncSession.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+
+        generation = self._generation
+        return self._put(key, await loader(), generation)
+
+    def _put(self, key: Hashable, body: bytes | None, generation: int) -> tuple[bytes, str] | None:
+        if body is None:
+            return None
+        etag = make_etag(body)
+
+        with self._lock:
+            if generation == self._generation and len(body) <= self.max_bytes:
+                self._remove(key)
+                self._entries[key] = (body, etag, time.monotonic() + self.ttl)
+                self._size += len(body)
+                while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+        return body, etag
+
+    def invalidate(self, key: Hashable) -> None:
+        pending = getattr(_deferred, "pending", None)
+        if pending is not None:
+            pending.append((self.invalidate, key))
+            return
+        with self._lock:
+            self._generation += 1
+            self._remove(key)
+
+    def clear(self) -> None:
+        pending = getattr(_deferred, "pending", None)
+        if pending is not None:
+            pending.append((self.clear,))
+            return
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[0])
+
+
+tech_cache = EntityCache()
+project_cache = EntityCache()
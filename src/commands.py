@@ -1,8 +1,12 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 from getpass import getpass
-import re
+import csv, json, os, re, sys, time
 
-from src.models import User, UserRole
-from src.security import hash_password
+import bcrypt
+from sqlalchemy import LargeBinary, delete, insert, inspect, or_, select, text
+
+from src.models import Base, RefreshToken, User, UserRole, ix_techs_project_count
 
 def create_admin(db_session):
     admin_exists = db_session.query(User).filter_by(is_admin=True).first()
@@ -18,6 +22,7 @@ def create_admin(db_session):
 
     # Inputs validation
     if user_creation_validation(username, password, password2, email):
+        from src.security import hash_password  # pulls in FastAPI, so only for the commands that hash
         admin = User(
             username=username,
             password_hash=hash_password(password),
@@ -38,6 +43,7 @@ def create_editor(db_session):
 
     # Inputs validation
     if user_creation_validation(username, password, password2, email):
+        from src.security import hash_password  # pulls in FastAPI, so only for the commands that hash
         editor = User(
             username=username,
             password_hash=hash_password(password),
@@ -50,7 +56,10 @@ def create_editor(db_session):
         print("Editor user was successfully created")
 
 
-def user_creation_validation(username: str, password: str, password2:str, email: str) -> bool:
+def user_creation_errors(username: str, password: str, password2: str, email: str) -> list[str]:
+    """
+    Check the fields of a new user and return what is wrong with them, if anything.
+    """
     error_msg = []
     if not username:
         error_msg.append("Username required.")
@@ -65,10 +74,257 @@ def user_creation_validation(username: str, password: str, password2:str, email:
     if not re.match(pattern, email):
         error_msg.append("Invalid email.")
 
+    return error_msg
+
+def user_creation_validation(username: str, password: str, password2:str, email: str) -> bool:
+    error_msg = user_creation_errors(username, password, password2, email)
     if error_msg:
-        print(f"\nAdmin wasn't created:")
+        print(f"\nUser wasn't created:")
         for i, msg in enumerate(error_msg, 1):
             print(f"{i}. {msg}")
         print("\n")
         return False
-    return True
\ No newline at end of file
+    return True
+
+
+def _read_user_rows(path: str):
+    """
+    Yield (row number, fields) from a CSV file with a header row, or from a JSONL file of objects.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for row_no, line in enumerate(file, 1):
+                if line.strip():
+                    try:
+                        yield row_no, json.loads(line)
+                    except ValueError:
+                        yield row_no, None
+        else:
+            # Row numbers count the header, so they match the line numbers an editor shows
+            for row_no, row in enumerate(csv.DictReader(file), 2):
+                yield row_no, row
+
+def _hash_passwords(passwords: list[str], rounds: int) -> list[str]:
+    # Runs in a worker process
+    return [bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode() for password in passwords]
+
+def _create_user_batch(db_session, pool: ProcessPoolExecutor, workers: int, rounds: int, batch: list) -> list:
+    """
+    Hash the passwords of a batch across the pool and insert its users in one transaction.
+
+    Returns (row number, error) pairs for the rows that clash with users already in the database.
+    """
+    usernames = [fields["username"] for _, fields in batch]
+    emails = [fields["email"] for _, fields in batch]
+    taken_usernames = set(db_session.scalars(select(User.username).where(User.username.in_(usernames))))
+    taken_emails = set(db_session.scalars(select(User.email).where(User.email.in_(emails))))
+
+    def is_taken(fields: dict) -> bool:
+        return fields["username"] in taken_usernames or fields["email"] in taken_emails
+
+    errors = [(row_no, "Username or email already registered.") for row_no, fields in batch if is_taken(fields)]
+    batch = [(row_no, fields) for row_no, fields in batch if not is_taken(fields)]
+    if not batch:
+        return errors
+
+    size = -(-len(batch) // workers)
+    chunks = [[fields["password"] for _, fields in batch[i:i + size]] for i in range(0, len(batch), size)]
+    hashes = [hashed for chunk in pool.map(_hash_passwords, chunks, [rounds] * len(chunks)) for hashed in chunk]
+
+    db_session.execute(insert(User), [
+        {"username": fields["username"], "email": fields["email"], "password_hash": hashed, "role": fields["role"]}
+        for (_, fields), hashed in zip(batch, hashes)
+    ])
+    db_session.commit()
+    return errors
+
+def bulk_create_users(db_session, path: str, batch_size: int = 1000) -> dict:
+    """
+    Create users from a CSV or JSONL file with username, email, password and an optional role column.
+
+    Rows are checked with the same rules as create-admin and create-editor. Passwords are hashed on a
+    process pool using every core, and each batch is inserted in its own transaction, so rows before
+    a failure stay created. Invalid rows are reported by row number and skipped.
+    """
+    from src.security import get_bcrypt_rounds  # pulls in FastAPI, so only for the commands that hash
+    rounds = get_bcrypt_rounds()
+    workers = os.cpu_count() or 1
+    roles = {role.value: role for role in UserRole}
+
+    created = failed = 0
+    seen_usernames, seen_emails = set(), set()
+    batch = []
+    started = time.perf_counter()
+
+    def report_errors(errors):
+        nonlocal failed
+        for row_no, error in errors:
+            print(f"Row {row_no}: {error}", file=sys.stderr)
+        failed += len(errors)
+
+    def flush():
+        nonlocal created, batch
+        errors = _create_user_batch(db_session, pool, workers, rounds, batch)
+        created += len(batch) - len(errors)
+        report_errors(errors)
+        batch = []
+        elapsed = time.perf_counter() - started
+        print(f"{created + failed} rows processed: {created} created, {failed} failed "
+              f"({created / elapsed:.0f} users/s)")
+
+    with ProcessPoolExecutor(workers) as pool:
+        for row_no, fields in _read_user_rows(path):
+            if not isinstance(fields, dict):
+                report_errors([(row_no, "Not a valid JSON object.")])
+                continue
+            username = str(fields.get("username") or "").strip()
+            email = str(fields.get("email") or "").strip()
+            password = str(fields.get("password") or "")
+            role = str(fields.get("role") or UserRole.USER.value).strip().lower()
+
+            errors = user_creation_errors(username, password, password, email)
+            if role not in roles:
+                errors.append(f"Role must be one of: {', '.join(roles)}.")
+            if username in seen_usernames or email in seen_emails:
+                errors.append("Duplicate username or email in the file.")
+            if errors:
+                report_errors([(row_no, " ".join(errors))])
+                continue
+
+            seen_usernames.add(username)
+            seen_emails.add(email)
+            batch.append((row_no, {"username": username, "email": email, "password": password,
+                                   "role": roles[role]}))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+    print(f"Done: {created} users created, {failed} rows failed")
+    return {"created": created, "failed": failed}
+
+
+def purge_refresh_tokens(db_session, batch_size: int = 500) -> int:
+    """
+    Delete expired and revoked refresh tokens, committing after every batch to keep transactions short.
+    """
+    now = datetime.now(timezone.utc)
+    purged = 0
+    while True:
+        ids = db_session.scalars(
+            select(RefreshToken.id)
+            .where(or_(RefreshToken.active.is_(False), RefreshToken.expires_at < now))
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+
+        db_session.execute(delete(RefreshToken).where(RefreshToken.id.in_(ids)))
+        db_session.commit()
+        purged += len(ids)
+
+    print(f"Purged {purged} refresh tokens.")
+    return purged
+
+def refresh_tokens_need_upgrade(bind) -> bool:
+    """
+    Check whether the refresh_tokens table still stores tokens instead of their digests.
+    """
+    token = next(column for column in inspect(bind).get_columns("refresh_tokens") if column["name"] == "token")
+    return not isinstance(token["type"], LargeBinary)
+
+def upgrade_refresh_tokens(db_session, batch_size: int = 5000) -> None:
+    """
+    Move a refresh_tokens table created before tokens were stored as digests to the current schema.
+
+    Column types can't be changed in place on SQLite, so the table is rebuilt with its unique token key and
+    purge indexes. Stored tokens are replaced by their digest, so tokens already handed out keep working.
+    """
+    from src.security import hash_refresh_token  # pulls in FastAPI, so only for the commands that need it
+    if not refresh_tokens_need_upgrade(db_session.get_bind()):
+        print("Refresh tokens are already stored as digests")
+        return
+    inspector = inspect(db_session.get_bind())
+
+    sqlite = db_session.get_bind().dialect.name == "sqlite"
+    if sqlite:
+        db_session.execute(text("BEGIN IMMEDIATE"))  # pysqlite would run the DDL below outside of the transaction
+        # Nothing refers to refresh_tokens, and this keeps the rename from re-checking every trigger in the schema
+        db_session.execute(text("PRAGMA legacy_alter_table=ON"))
+    for index in inspector.get_indexes("refresh_tokens"):
+        db_session.execute(text(f"DROP INDEX {index['name']}"))  # index names are global, the new table reuses them
+    db_session.execute(text("ALTER TABLE refresh_tokens RENAME TO refresh_tokens_old"))
+    if sqlite:
+        db_session.execute(text("PRAGMA legacy_alter_table=OFF"))
+    RefreshToken.__table__.create(db_session.connection())
+
+    columns = "id, user_id, token, created_at, expires_at, active"
+    copied, after = 0, 0
+    while True:
+        rows = db_session.execute(text(f"SELECT {columns} FROM refresh_tokens_old WHERE id > :after "
+                                       f"ORDER BY id LIMIT :limit"), {"after": after, "limit": batch_size}).all()
+        if not rows:
+            break
+        db_session.execute(text(f"INSERT INTO refresh_tokens ({columns}) VALUES "
+                                f"(:id, :user_id, :token, :created_at, :expires_at, :active)"),
+                           [{**row._asdict(), "token": hash_refresh_token(row.token)} for row in rows])
+        copied += len(rows)
+        after = rows[-1].id
+    db_session.execute(text("DROP TABLE refresh_tokens_old"))
+    db_session.commit()
+    print(f"Refresh tokens were successfully upgraded: {copied} tokens stored as digests")
+
+
+def rebuild_search_index(db_session) -> None:
+    """
+    Rebuild the full-text search indexes from the techs and projects tables.
+    """
+    for table in ("techs_fts", "projects_fts"):
+        db_session.execute(text(f"INSERT INTO {table}({table}) VALUES ('rebuild')"))
+    db_session.commit()
+    print("Search index was successfully rebuilt")
+
+def rebuild_change_log(db_session) -> None:
+    """
+    Restart the change log from the current techs, projects and links, keeping the delete tombstones.
+
+    Also upgrades databases created before the change log existed. Clients get every entity again on their next sync.
+    """
+    bind = db_session.get_bind()
+    for table in ("techs", "projects"):
+        if "change_version" not in {column["name"] for column in inspect(bind).get_columns(table)}:
+            db_session.execute(text(f"ALTER TABLE {table} ADD COLUMN change_version INTEGER NOT NULL DEFAULT 0"))
+    db_session.commit()
+    Base.metadata.create_all(bind=bind)  # the catalog_changes table and its triggers
+
+    db_session.execute(text("DELETE FROM catalog_changes WHERE op != 'delete'"))
+    for entity, op, table, columns in (("tech", "upsert", "techs", "tech_id, 0"),
+                                       ("project", "upsert", "projects", "project_id, 0"),
+                                       ("link", "link", "project_techs", "project_id, tech_id")):
+        db_session.execute(text(f"INSERT OR REPLACE INTO catalog_changes(entity, entity_id, related_id, op) "
+                                f"SELECT '{entity}', {columns}, '{op}' FROM {table} ORDER BY 2, 3"))
+    for entity, table, key in (("tech", "techs", "tech_id"), ("project", "projects", "project_id")):
+        db_session.execute(text(f"UPDATE {table} SET change_version = (SELECT version FROM catalog_changes "
+                                f"WHERE entity = '{entity}' AND entity_id = {table}.{key} AND related_id = 0)"))
+    db_session.commit()
+    print("Change log was successfully rebuilt")
+
+def rebuild_tech_counts(db_session) -> int:
+    """
+    Recount the projects of every tech from project_techs, fixing and reporting the counts that drifted.
+
+    Also upgrades databases created before the counters existed.
+    """
+    bind = db_session.get_bind()
+    if "project_count" not in {column["name"] for column in inspect(bind).get_columns("techs")}:
+        db_session.execute(text("ALTER TABLE techs ADD COLUMN project_count INTEGER NOT NULL DEFAULT 0"))
+        db_session.commit()
+    Base.metadata.create_all(bind=bind)  # the counting triggers
+    ix_techs_project_count.create(bind, checkfirst=True)  # create_all skips indexes of existing tables
+
+    actual = "(SELECT count(*) FROM project_techs WHERE project_techs.tech_id = techs.tech_id)"
+    drifted = db_session.execute(text(f"UPDATE techs SET project_count = {actual} "
+                                      f"WHERE project_count != {actual}")).rowcount
+    db_session.commit()
+    print(f"Tech project counts were successfully rebuilt: {drifted} techs had drifted")
+    return drifted
@@ -1,10 +1,47 @@
+import re
+
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, case, delete, func, insert, select, text, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+
+from typing import Iterator, List, Sequence
+
+from src.cache import make_etag, tech_cache, project_cache
+from src.models import CatalogChange, Tech, Project, project_techs
+from src.pagination import STREAM_CHUNK_SIZE
+from src.serialization import dump_plain
+from src.schemas import (TechCreateSchema, TechUpdateSchema, TechReadSchema, ProjectCreateSchema, ProjectUpdateSchema,
+                         ProjectReadSchema)
+
+BULK_MAX_ITEMS = 10_000
+BULK_QUERY_CHUNK = 500  # keeps IN (...) lists below SQLite's bound parameter limit
+
+# Columns that can be requested with ?fields=; the ID always comes first and is always returned
+TECH_FIELDS = ("tech_id", "name", "description")
+PROJECT_FIELDS = ("project_id", "name", "description")
+
+def _invalidate_tech(tech_id: int) -> None:
+    tech_cache.invalidate(tech_id)
+    project_cache.clear()  # projects embed their techs
 
-from typing import List
+def _invalidate_project(project_id: int) -> None:
+    project_cache.invalidate(project_id)
 
-from src.models import Tech, Project
-from src.schemas import TechCreateSchema, TechUpdateSchema, ProjectCreateSchema, ProjectUpdateSchema
+def _payload(row: dict) -> tuple[bytes, str]:
+    body = dump_plain(row)
+    return body, make_etag(body)
+
+def _keyset_page(query: Select, key, limit: int | None, after: int | None) -> Select:
+    query = query.order_by(key)
+    if after is not None:
+        query = query.where(key > after)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+def _columns(model, fields: Sequence[str], key: str) -> list:
+    return [getattr(model, field) for field in dict.fromkeys((key, *fields))]
 
 ### Tech CRUD
 def create_tech(db: Session, data: TechCreateSchema) -> Tech:
@@ -27,11 +64,105 @@ def read_tech(db: Session, tech_id: int) -> Tech | None:
     """
     return db.get(Tech, tech_id)
 
-def read_all_tech(db: Session) -> List[Tech]:
+def read_tech_payload(db: Session, tech_id: int, fields: Sequence[str] | None = None) -> tuple[bytes, str] | None:
+    """
+    Get a serialized Tech and its ETag through the entity cache.
+
+    Requests for a subset of the fields bypass the cache.
+    """
+    if fields is not None:
+        tech = read_tech_fields(db, tech_id, fields)
+        return _payload(tech) if tech else None
+
+    def load() -> bytes | None:
+        tech = read_tech(db, tech_id)
+        return TechReadSchema.model_validate(tech).model_dump_json().encode() if tech else None
+
+    return tech_cache.get_or_load(tech_id, load)
+
+def tech_page_query(limit: int | None = None, after: int | None = None) -> Select:
+    """
+    Build the keyset-paginated SELECT for Tech objects ordered by ID.
+    """
+    return _keyset_page(select(Tech), Tech.tech_id, limit, after)
+
+def read_all_tech(db: Session, limit: int | None = None, after: int | None = None) -> List[Tech]:
+    """
+    Get Tech objects ordered by ID, optionally one keyset page at a time.
+    """
+    return db.scalars(tech_page_query(limit, after)).all()  #type: ignore
+
+def iter_all_tech(db: Session, after: int | None = None,
+                  chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[Tech]]:
+    """
+    Yield all Tech objects in keyset-paginated chunks.
+    """
+    while True:
+        chunk = read_all_tech(db, limit=chunk_size, after=after)
+        if not chunk:
+            return
+        yield chunk
+        after = chunk[-1].tech_id
+        db.expunge_all()  # keep the identity map from growing with the table
+
+def tech_rows_query(fields: Sequence[str] = TECH_FIELDS, limit: int | None = None, after: int | None = None) -> Select:
+    """
+    Build the keyset-paginated SELECT for only the given Tech columns.
+    """
+    return _keyset_page(select(*_columns(Tech, fields, "tech_id")), Tech.tech_id, limit, after)
+
+def read_tech_rows(db: Session, fields: Sequence[str] = TECH_FIELDS, limit: int | None = None,
+                   after: int | None = None) -> List[dict]:
+    """
+    Get the given Tech columns as dicts ordered by ID, without loading ORM objects.
+    """
+    return [dict(row) for row in db.execute(tech_rows_query(fields, limit, after)).mappings()]
+
+def read_tech_fields(db: Session, tech_id: int, fields: Sequence[str] = TECH_FIELDS) -> dict | None:
+    """
+    Get the given columns of a single Tech as a dict.
+    """
+    row = db.execute(select(*_columns(Tech, fields, "tech_id")).where(Tech.tech_id == tech_id)).mappings().first()
+    return dict(row) if row else None
+
+def iter_tech_rows(db: Session, fields: Sequence[str] = TECH_FIELDS, after: int | None = None,
+                   chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[dict]]:
+    """
+    Yield the given Tech columns in keyset-paginated chunks.
+    """
+    while True:
+        chunk = read_tech_rows(db, fields, limit=chunk_size, after=after)
+        if not chunk:
+            return
+        yield chunk
+        after = chunk[-1]["tech_id"]
+
+def read_tech_projects(db: Session, tech_id: int, fields: Sequence[str] = PROJECT_FIELDS, include_techs: bool = True,
+                       limit: int | None = None, after: int | None = None) -> List[dict] | None:
+    """
+    Get the Projects using a Tech as dicts of the given columns, ordered by ID, one keyset page at a time.
+    """
+    if db.get(Tech, tech_id) is None:
+        return None
+    return read_project_rows(db, fields, include_techs, limit=limit, after=after, tech_ids=[tech_id])
+
+def popular_techs_query(limit: int) -> Select:
+    """
+    Select the `limit` techs linked to the most projects, ties broken by ID.
+
+    Reads the first entries of the project_count index, so the cost doesn't grow with the catalog.
+    """
+    return (
+        select(Tech.tech_id, Tech.name, Tech.project_count)
+        .order_by(Tech.project_count.desc(), Tech.tech_id)
+        .limit(limit)
+    )
+
+def read_popular_techs(db: Session, limit: int = 10) -> List[dict]:
     """
-    Get all Tech objects
+    Get the techs linked to the most projects, with their project counts.
     """
-    return db.query(Tech).all()  #type: ignore
+    return [dict(row) for row in db.execute(popular_techs_query(limit)).mappings()]
 
 def update_tech(db: Session, tech_id: int, data: TechUpdateSchema) -> Tech | None:
     """
@@ -46,6 +177,7 @@ def update_tech(db: Session, tech_id: int, data: TechUpdateSchema) -> Tech | Non
         setattr(tech, key, value)
 
     db.commit()
+    _invalidate_tech(tech_id)
     db.refresh(tech)
     return tech
 
@@ -60,6 +192,7 @@ def delete_tech(db: Session, tech_id: int) -> None:
 
     db.delete(tech)
     db.commit()
+    _invalidate_tech(tech_id)
 
 ### Project CRUD
 def create_project(db: Session, data: ProjectCreateSchema) -> Project:
@@ -72,21 +205,182 @@ def create_project(db: Session, data: ProjectCreateSchema) -> Project:
     )
 
     db.add(project)
+    db.flush()
+    project_id = project.project_id  # read before the commit expires it
     db.commit()
-    db.refresh(project)
-    return project
+    return _load_project(db, project_id)
+
+def _load_project(db: Session, project_id: int) -> Project | None:
+    """
+    Load a Project together with its techs in two queries, discarding any stale state.
+    """
+    return db.get(Project, project_id, options=[selectinload(Project.techs)], populate_existing=True)
 
 def read_project(db: Session, project_id: int) -> Project | None:
     """
     Get a Project object by its ID.
     """
-    return db.get(Project, project_id)
+    return _load_project(db, project_id)
+
+def read_project_payload(db: Session, project_id: int, fields: Sequence[str] | None = None,
+                         include_techs: bool = False) -> tuple[bytes, str] | None:
+    """
+    Get a serialized Project and its ETag through the entity cache.
+
+    Requests for a subset of the fields bypass the cache; techs are then only embedded with include_techs.
+    """
+    if fields is not None:
+        project = read_project_fields(db, project_id, fields, include_techs)
+        return _payload(project) if project else None
+
+    def load() -> bytes | None:
+        project = read_project(db, project_id)
+        return ProjectReadSchema.model_validate(project).model_dump_json().encode() if project else None
+
+    return project_cache.get_or_load(project_id, load)
+
+def projects_with_techs(tech_ids: Sequence[int], match: str = "all") -> Select:
+    """
+    SELECT of the IDs of projects linked to all (match="all") or any (match="any") of the given techs.
+
+    Served from the (tech_id, project_id) index without touching the projects table.
+    """
+    query = select(project_techs.c.project_id).where(project_techs.c.tech_id.in_(tech_ids))
+    if match == "all":
+        query = query.group_by(project_techs.c.project_id).having(func.count() == len(set(tech_ids)))
+    return query
+
+def project_page_query(limit: int | None = None, after: int | None = None, tech_ids: Sequence[int] = (),
+                       match: str = "all") -> Select:
+    """
+    Build the keyset-paginated SELECT for Project objects ordered by ID, with their techs batch-loaded.
+
+    Passing tech_ids restricts the page to projects using those techs.
+    """
+    query = select(Project).options(selectinload(Project.techs))
+    if tech_ids:
+        query = query.where(Project.project_id.in_(projects_with_techs(tech_ids, match)))
+    return _keyset_page(query, Project.project_id, limit, after)
+
+def read_all_project(db: Session, limit: int | None = None, after: int | None = None, tech_ids: Sequence[int] = (),
+                     match: str = "all") -> List[Project]:
+    """
+    Get Project objects ordered by ID, optionally one keyset page at a time and filtered by tech.
+    """
+    return db.scalars(project_page_query(limit, after, tech_ids, match)).all()  #type: ignore
+
+def iter_all_project(db: Session, after: int | None = None, tech_ids: Sequence[int] = (), match: str = "all",
+                     chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[Project]]:
+    """
+    Yield all Project objects in keyset-paginated chunks.
+    """
+    while True:
+        chunk = read_all_project(db, limit=chunk_size, after=after, tech_ids=tech_ids, match=match)
+        if not chunk:
+            return
+        yield chunk
+        after = chunk[-1].project_id
+        db.expunge_all()  # keep the identity map from growing with the table
+
+def project_rows_query(fields: Sequence[str] = PROJECT_FIELDS, limit: int | None = None, after: int | None = None,
+                       tech_ids: Sequence[int] = (), match: str = "all") -> Select:
+    """
+    Build the keyset-paginated SELECT for only the given Project columns, optionally filtered by tech.
+    """
+    query = select(*_columns(Project, fields, "project_id"))
+    if tech_ids:
+        query = query.where(Project.project_id.in_(projects_with_techs(tech_ids, match)))
+    return _keyset_page(query, Project.project_id, limit, after)
+
+def project_techs_query(project_ids: Sequence[int]) -> Select:
+    """
+    Build the SELECT for the techs of the given projects, keyed by project_id.
+    """
+    return (
+        select(project_techs.c.project_id, *_columns(Tech, TECH_FIELDS, "tech_id"))
+        .join(Tech, Tech.tech_id == project_techs.c.tech_id)
+        .where(project_techs.c.project_id.in_(project_ids))
+        .order_by(project_techs.c.project_id, Tech.tech_id)
+    )
+
+def attach_techs(projects: List[dict], tech_rows) -> List[dict]:
+    """
+    Embed tech rows from project_techs_query into the project dicts they belong to.
+    """
+    by_id = {}
+    for project in projects:
+        project["techs"] = by_id[project["project_id"]] = []
+    for row in tech_rows:
+        project_id, *values = row
+        by_id[project_id].append(dict(zip(TECH_FIELDS, values)))
+    return projects
+
+def _with_techs(db: Session, projects: List[dict]) -> List[dict]:
+    ids = [project["project_id"] for project in projects]
+    tech_rows = []
+    for i in range(0, len(ids), BULK_QUERY_CHUNK):
+        tech_rows.extend(db.execute(project_techs_query(ids[i:i + BULK_QUERY_CHUNK])))
+    return attach_techs(projects, tech_rows)
+
+def read_project_rows(db: Session, fields: Sequence[str] = PROJECT_FIELDS, include_techs: bool = True,
+                      limit: int | None = None, after: int | None = None, tech_ids: Sequence[int] = (),
+                      match: str = "all") -> List[dict]:
+    """
+    Get the given Project columns as dicts ordered by ID, with their techs only when include_techs is set.
+
+    Nothing goes through the ORM, so this is the cheap path for list endpoints.
+    """
+    projects = [dict(row) for row in
+                db.execute(project_rows_query(fields, limit, after, tech_ids, match)).mappings()]
+    return _with_techs(db, projects) if include_techs else projects
+
+def read_project_fields(db: Session, project_id: int, fields: Sequence[str] = PROJECT_FIELDS,
+                        include_techs: bool = True) -> dict | None:
+    """
+    Get the given columns of a single Project as a dict, with its techs only when include_techs is set.
+    """
+    row = db.execute(
+        select(*_columns(Project, fields, "project_id")).where(Project.project_id == project_id)
+    ).mappings().first()
+    if not row:
+        return None
+    project = dict(row)
+    return _with_techs(db, [project])[0] if include_techs else project
+
+def iter_project_rows(db: Session, fields: Sequence[str] = PROJECT_FIELDS, include_techs: bool = True,
+                      after: int | None = None, tech_ids: Sequence[int] = (), match: str = "all",
+                      chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[dict]]:
+    """
+    Yield the given Project columns in keyset-paginated chunks.
+    """
+    while True:
+        chunk = read_project_rows(db, fields, include_techs, limit=chunk_size, after=after, tech_ids=tech_ids,
+                                  match=match)
+        if not chunk:
+            return
+        yield chunk
+        after = chunk[-1]["project_id"]
 
-def read_all_project(db: Session) -> List[Project]:
+def project_tech_facets_query(tech_ids: Sequence[int] = (), match: str = "all") -> Select:
     """
-    Get all Project objects.
+    Build the SELECT counting, per tech, the projects that match a tech filter.
     """
-    return db.query(Project).all()  #type: ignore
+    count = func.count().label("count")
+    query = (
+        select(Tech.tech_id, Tech.name, count)
+        .join(project_techs, project_techs.c.tech_id == Tech.tech_id)
+        .group_by(Tech.tech_id)
+        .order_by(count.desc(), Tech.tech_id)
+    )
+    if tech_ids:
+        query = query.where(project_techs.c.project_id.in_(projects_with_techs(tech_ids, match)))
+    return query
+
+def project_tech_facets(db: Session, tech_ids: Sequence[int] = (), match: str = "all") -> List[dict]:
+    """
+    Count, for every tech, the projects matching the current tech filter.
+    """
+    return [dict(row) for row in db.execute(project_tech_facets_query(tech_ids, match)).mappings()]
 
 def update_project(db: Session, project_id: int, data: ProjectUpdateSchema) -> Project | None:
     """
@@ -101,8 +395,8 @@ def update_project(db: Session, project_id: int, data: ProjectUpdateSchema) -> P
         setattr(project, key, value)
 
     db.commit()
-    db.refresh(project)
-    return project
+    _invalidate_project(project_id)
+    return _load_project(db, project_id)
 
 def delete_project(db: Session, project_id: int) -> None:
     """
@@ -114,19 +408,344 @@ def delete_project(db: Session, project_id: int) -> None:
 
     db.delete(project)
     db.commit()
+    _invalidate_project(project_id)
 
-def link_techs_to_project(db: Session, project_id: int, tech_ids: list[int]) -> Project | None:
-    project = db.get(Project, project_id)
-    if not project:
+def plan_link_changes(requested: set[int], known: set[int], current: set[int], mode: str) -> tuple[set, set]:
+    """
+    Work out which tech links to insert and delete for a link mode ("add", "remove" or "replace").
+    """
+    to_add, to_remove = set(), set()
+    if mode in ("add", "replace"):
+        to_add = known - current
+    if mode == "remove":
+        to_remove = requested & current
+    elif mode == "replace":
+        to_remove = current - known
+    return to_add, to_remove
+
+def link_techs_to_project(db: Session, project_id: int, tech_ids: list[int], mode: str = "add") -> dict | None:
+    """
+    Add, remove or replace the techs linked to a Project.
+
+    The change is computed with set operations against the project_techs table and applied as bulk
+    INSERT / DELETE statements, so the Project.techs collection is never loaded for the diff.
+    """
+    if db.get(Project, project_id) is None:
         return None
 
-    techs = db.query(Tech).filter(Tech.tech_id.in_(tech_ids)).all()
+    requested = set(tech_ids)
+    ids = list(requested)
+    known = set()
+    for i in range(0, len(ids), BULK_QUERY_CHUNK):
+        known.update(db.scalars(select(Tech.tech_id).where(Tech.tech_id.in_(ids[i:i + BULK_QUERY_CHUNK]))))
 
-    for t in techs:
-        if t not in project.techs:
-            project.techs.append(t)
+    current = set(db.scalars(select(project_techs.c.tech_id).where(project_techs.c.project_id == project_id)))
 
+    to_add, to_remove = plan_link_changes(requested, known, current, mode)
+    if to_add:
+        db.execute(insert(project_techs).prefix_with("OR IGNORE", dialect="sqlite"),
+                   [{"project_id": project_id, "tech_id": tech_id} for tech_id in to_add])
+    removed = list(to_remove)
+    for i in range(0, len(removed), BULK_QUERY_CHUNK):
+        db.execute(delete(project_techs).where(project_techs.c.project_id == project_id,
+                                               project_techs.c.tech_id.in_(removed[i:i + BULK_QUERY_CHUNK])))
     db.commit()
-    db.refresh(project)
-    return project  #type: ignore
+    _invalidate_project(project_id)
+
+    return {
+        "project": _load_project(db, project_id),
+        "added_tech_ids": sorted(to_add),
+        "removed_tech_ids": sorted(to_remove),
+        "unknown_tech_ids": sorted(requested - known),
+    }
+
+### Bulk upserts
+def _ids_by_name(db: Session, model, names: Sequence[str]) -> dict[str, int]:
+    """
+    Map names to primary keys for the rows of `model` that already exist.
+    """
+    id_column = model.__mapper__.primary_key[0]
+    found = {}
+    for i in range(0, len(names), BULK_QUERY_CHUNK):
+        rows = db.execute(select(model.name, id_column).where(model.name.in_(names[i:i + BULK_QUERY_CHUNK])))
+        found.update(rows.tuples().all())
+    return found
+
+def _bulk_upsert(db: Session, model, items: Sequence, overwrite: bool) -> List[dict]:
+    """
+    Insert items keyed on name in a single transaction and report the outcome of each item.
+
+    Existing names are reported as conflicts, or have their description overwritten when `overwrite` is set.
+    """
+    id_key = model.__mapper__.primary_key[0].key
+    existing = _ids_by_name(db, model, list({item.name for item in items}))
+
+    results = []
+    new_rows, updated_rows = [], []
+    seen = set()
+    for index, item in enumerate(items):
+        if item.name in seen:
+            results.append({"index": index, "name": item.name, "status": "conflict",
+                            "detail": "Duplicate name in request"})
+            continue
+        seen.add(item.name)
+
+        if item.name not in existing:
+            new_rows.append({"name": item.name, "description": item.description})
+            results.append({"index": index, "name": item.name, "status": "created"})
+        elif overwrite:
+            updated_rows.append({id_key: existing[item.name], "description": item.description})
+            results.append({"index": index, "name": item.name, "status": "updated", "id": existing[item.name]})
+        else:
+            results.append({"index": index, "name": item.name, "status": "conflict", "id": existing[item.name],
+                            "detail": "Name already exists"})
+
+    try:
+        if new_rows:
+            db.execute(insert(model), new_rows)
+        if updated_rows:
+            db.execute(update(model), updated_rows)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Names were modified concurrently, retry the request.")
+
+    invalidate = _invalidate_tech if model is Tech else _invalidate_project
+    for row in updated_rows:
+        invalidate(row[id_key])
+
+    created = _ids_by_name(db, model, [row["name"] for row in new_rows])
+    for result in results:
+        if result["status"] == "created":
+            result["id"] = created.get(result["name"])
+    return results
+
+def bulk_upsert_techs(db: Session, items: Sequence[TechCreateSchema], overwrite: bool = False) -> List[dict]:
+    """
+    Create many Tech objects at once, upserting on name.
+    """
+    return _bulk_upsert(db, Tech, items, overwrite)
+
+def bulk_upsert_projects(db: Session, items: Sequence[ProjectCreateSchema], overwrite: bool = False) -> List[dict]:
+    """
+    Create many Project objects at once, upserting on name.
+    """
+    return _bulk_upsert(db, Project, items, overwrite)
+
+
+### Catalog export / import
+TRANSFER_BATCH_SIZE = 5000
+
+def iter_link_rows(db: Session, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[dict]]:
+    """
+    Yield every project-tech link as a pair of names, in keyset-paginated chunks.
+    """
+    key = (project_techs.c.project_id, project_techs.c.tech_id)
+    query = (
+        select(*key, Project.name.label("project"), Tech.name.label("tech"))
+        .join(Project, Project.project_id == project_techs.c.project_id)
+        .join(Tech, Tech.tech_id == project_techs.c.tech_id)
+        .order_by(*key)
+        .limit(chunk_size)
+    )
+    after = None
+    while True:
+        chunk = db.execute(query if after is None else query.where(tuple_(*key) > tuple_(*after))).all()
+        if not chunk:
+            return
+        yield [{"project": row.project, "tech": row.tech} for row in chunk]
+        after = (chunk[-1].project_id, chunk[-1].tech_id)
+
+def iter_catalog_records(db: Session, chunk_size: int = TRANSFER_BATCH_SIZE) -> Iterator[List[dict]]:
+    """
+    Yield the whole catalog as export records: techs, then projects, then links.
+
+    Records refer to each other by name, so they can be imported into a database with different IDs.
+    """
+    for chunk in iter_tech_rows(db, TECH_FIELDS, chunk_size=chunk_size):
+        yield [{"type": "tech", "name": row["name"], "description": row["description"]} for row in chunk]
+    for chunk in iter_project_rows(db, PROJECT_FIELDS, include_techs=False, chunk_size=chunk_size):
+        yield [{"type": "project", "name": row["name"], "description": row["description"]} for row in chunk]
+    for chunk in iter_link_rows(db, chunk_size):
+        yield [{"type": "link", **row} for row in chunk]
+
+class CatalogImporter:
+    """
+    Write export records in batches, one transaction per batch and record type.
+
+    Techs and projects are upserted on name like the bulk endpoints. Links name their project and tech:
+    tech names are resolved through an in-memory map loaded once, project names with one lookup per batch.
+    Pending techs and projects are always written before pending links, so links may refer to earlier lines.
+    """
+
+    def __init__(self, db: Session, overwrite: bool = False, batch_size: int = TRANSFER_BATCH_SIZE):
+        self.db = db
+        self.overwrite = overwrite
+        self.batch_size = batch_size
+        self.counts = {
+            "techs": {"created": 0, "updated": 0, "conflict": 0},
+            "projects": {"created": 0, "updated": 0, "conflict": 0},
+            "links": {"created": 0, "existing": 0, "unknown": 0},
+        }
+        self._techs: List[TechCreateSchema] = []
+        self._projects: List[ProjectCreateSchema] = []
+        self._links: List[tuple[str, str]] = []
+        self._tech_ids: dict[str, int] | None = None
+
+    def add(self, record: dict) -> bool:
+        """
+        Queue a record. Returns True once a batch is full and flush() should be called.
+
+        Raises ValueError (or pydantic's ValidationError) for records that can't be imported.
+        """
+        kind = record.get("type")
+        if kind == "tech":
+            self._techs.append(TechCreateSchema.model_validate(record))
+        elif kind == "project":
+            self._projects.append(ProjectCreateSchema.model_validate(record))
+        elif kind == "link":
+            project, tech = record.get("project"), record.get("tech")
+            if not isinstance(project, str) or not isinstance(tech, str):
+                raise ValueError("link records need 'project' and 'tech' names")
+            self._links.append((project, tech))
+        else:
+            raise ValueError(f"unknown record type {kind!r}")
+        return max(len(self._techs), len(self._projects), len(self._links)) >= self.batch_size
+
+    def flush(self) -> None:
+        """
+        Write every queued record.
+        """
+        if self._techs:
+            results = _bulk_upsert(self.db, Tech, self._techs, self.overwrite)
+            self._count("techs", results)
+            if self._tech_ids is not None:
+                self._tech_ids.update((result["name"], result["id"]) for result in results if result.get("id"))
+            self._techs = []
+        if self._projects:
+            self._count("projects", _bulk_upsert(self.db, Project, self._projects, self.overwrite))
+            self._projects = []
+        if self._links:
+            self._flush_links()
+            self._links = []
+
+    def _count(self, kind: str, results: List[dict]) -> None:
+        for result in results:
+            self.counts[kind][result["status"]] += 1
+
+    def _flush_links(self) -> None:
+        if self._tech_ids is None:
+            self._tech_ids = dict(self.db.execute(select(Tech.name, Tech.tech_id)).tuples().all())
+        project_ids = _ids_by_name(self.db, Project, list({project for project, _ in self._links}))
+
+        pairs = {}
+        unknown = 0
+        for project, tech in self._links:
+            project_id, tech_id = project_ids.get(project), self._tech_ids.get(tech)
+            if project_id is None or tech_id is None:
+                unknown += 1
+            else:
+                pairs[project_id, tech_id] = None
+
+        created = 0
+        if pairs:
+            created = self.db.execute(insert(project_techs).prefix_with("OR IGNORE", dialect="sqlite"),
+                                      [{"project_id": project_id, "tech_id": tech_id}
+                                       for project_id, tech_id in pairs]).rowcount
+        self.db.commit()
+        for project_id in {project_id for project_id, _ in pairs}:
+            _invalidate_project(project_id)
+
+        links = self.counts["links"]
+        links["created"] += created
+        links["existing"] += len(self._links) - unknown - created
+        links["unknown"] += unknown
+
+
+### Search
+_SEARCH_QUERY = text("""
+    SELECT * FROM (
+        SELECT 'tech' AS type, techs.tech_id AS id, techs.name, techs.description,
+               -bm25(techs_fts, 10.0, 1.0) AS score
+        FROM techs_fts JOIN techs ON techs.tech_id = techs_fts.rowid
+        WHERE techs_fts MATCH :query ORDER BY score DESC LIMIT :limit
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'project' AS type, projects.project_id AS id, projects.name, projects.description,
+               -bm25(projects_fts, 10.0, 1.0) AS score
+        FROM projects_fts JOIN projects ON projects.project_id = projects_fts.rowid
+        WHERE projects_fts MATCH :query ORDER BY score DESC LIMIT :limit
+    )
+    ORDER BY score DESC LIMIT :limit
+""")
+
+def to_fts_query(q: str) -> str:
+    """
+    Turn free text into an FTS5 query matching every word as a prefix, with FTS5 syntax neutralized.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", q))
+
+def search_catalog(db: Session, q: str, limit: int = 20) -> List[dict]:
+    """
+    Full-text search over Tech and Project names and descriptions, best matches first.
+
+    Name matches weigh ten times more than description matches.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Search requires SQLite FTS5.")
+
+    query = to_fts_query(q)
+    if not query:
+        return []
+    return [dict(row) for row in db.execute(_SEARCH_QUERY, {"query": query, "limit": limit}).mappings()]
+
+
+### Change log
+def changes_query(since: int = 0, limit: int | None = None) -> Select:
+    """
+    Build the SELECT for the catalog changes after a version, with the current name and description of upserts.
+    """
+    is_link = CatalogChange.entity == "link"
+    query = (
+        select(CatalogChange.version, CatalogChange.entity.label("type"), CatalogChange.op,
+               CatalogChange.entity_id.label("id"),
+               case((is_link, CatalogChange.related_id)).label("tech_id"),
+               func.coalesce(Tech.name, Project.name).label("name"),
+               func.coalesce(Tech.description, Project.description).label("description"))
+        .outerjoin(Tech, (CatalogChange.entity == "tech") & (Tech.tech_id == CatalogChange.entity_id))
+        .outerjoin(Project, (CatalogChange.entity == "project") & (Project.project_id == CatalogChange.entity_id))
+        .where(CatalogChange.version > since)
+        .order_by(CatalogChange.version)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+def _check_change_log(db: Session) -> None:
+    if db.get_bind().dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="The change log requires SQLite triggers.")
+
+def read_changes(db: Session, since: int = 0, limit: int | None = None) -> List[dict]:
+    """
+    Get the latest change of every Tech, Project and link changed after `since`, oldest first.
+
+    Each entity appears once, so the cost follows the amount of churn rather than the size of the catalog.
+    """
+    _check_change_log(db)
+    return [dict(row) for row in db.execute(changes_query(since, limit)).mappings()]
+
+def iter_changes(db: Session, since: int = 0, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[dict]]:
+    """
+    Yield the changes after `since` in version-ordered chunks.
+    """
+    _check_change_log(db)  # before streaming starts, so it still becomes an error response
+    return _iter_changes(db, since, chunk_size)
 
+def _iter_changes(db: Session, since: int, chunk_size: int) -> Iterator[List[dict]]:
+    while True:
+        chunk = [dict(row) for row in db.execute(changes_query(since, chunk_size)).mappings()]
+        if not chunk:
+            return
+        yield chunk
+        since = chunk[-1]["version"]
@@ -0,0 +1,300 @@
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from typing import AsyncIterator, List, Sequence
+
+from src.cache import tech_cache, project_cache
+from src.crud import (BULK_QUERY_CHUNK, PROJECT_FIELDS, TECH_FIELDS, _columns, _invalidate_tech, _invalidate_project,
+                      _payload, attach_techs, tech_page_query, tech_rows_query, project_page_query, project_rows_query,
+                      project_techs_query, plan_link_changes)
+from src.models import Tech, Project, project_techs
+from src.pagination import STREAM_CHUNK_SIZE
+from src.schemas import (TechCreateSchema, TechUpdateSchema, TechReadSchema, ProjectCreateSchema, ProjectUpdateSchema,
+                         ProjectReadSchema)
+
+# Async counterparts of src.crud for the DB_ASYNC routers. Relationships are always loaded eagerly,
+# since an AsyncSession can't lazy-load them during serialization.
+
+### Tech CRUD
+async def create_tech(db: AsyncSession, data: TechCreateSchema) -> Tech:
+    """
+    Create a new Tech object and save it to the database.
+    """
+    tech = Tech(
+        name = data.name,
+        description = data.description,
+    )
+
+    db.add(tech)
+    await db.commit()
+    await db.refresh(tech)
+    return tech
+
+async def read_tech(db: AsyncSession, tech_id: int) -> Tech | None:
+    """
+    Get a Tech object by its ID.
+    """
+    return await db.get(Tech, tech_id)
+
+async def read_tech_payload(db: AsyncSession, tech_id: int,
+                            fields: Sequence[str] | None = None) -> tuple[bytes, str] | None:
+    """
+    Get a serialized Tech and its ETag through the entity cache.
+
+    Requests for a subset of the fields bypass the cache.
+    """
+    if fields is not None:
+        tech = await read_tech_fields(db, tech_id, fields)
+        return _payload(tech) if tech else None
+
+    async def load() -> bytes | None:
+        tech = await read_tech(db, tech_id)
+        return TechReadSchema.model_validate(tech).model_dump_json().encode() if tech else None
+
+    return await tech_cache.aget_or_load(tech_id, load)
+
+async def read_all_tech(db: AsyncSession, limit: int | None = None, after: int | None = None) -> List[Tech]:
+    """
+    Get Tech objects ordered by ID, optionally one keyset page at a time.
+    """
+    return (await db.scalars(tech_page_query(limit, after))).all()  #type: ignore
+
+async def iter_all_tech(db: AsyncSession, after: int | None = None,
+                        chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[Tech]]:
+    """
+    Yield all Tech objects in keyset-paginated chunks.
+    """
+    while True:
+        chunk = await read_all_tech(db, limit=chunk_size, after=after)
+        if not chunk:
+            return
+        yield chunk
+        after = chunk[-1].tech_id
+        db.expunge_all()
+
+async def read_tech_rows(db: AsyncSession, fields: Sequence[str] = TECH_FIELDS, limit: int | None = None,
+                         after: int | None = None) -> List[dict]:
+    """
+    Get the given Tech columns as dicts ordered by ID, without loading ORM objects.
+    """
+    return [dict(row) for row in (await db.execute(tech_rows_query(fields, limit, after))).mappings()]
+
+async def read_tech_fields(db: AsyncSession, tech_id: int, fields: Sequence[str] = TECH_FIELDS) -> dict | None:
+    """
+    Get the given columns of a single Tech as a dict.
+    """
+    result = await db.execute(select(*_columns(Tech, fields, "tech_id")).where(Tech.tech_id == tech_id))
+    row = result.mappings().first()
+    return dict(row) if row else None
+
+async def iter_tech_rows(db: AsyncSession, fields: Sequence[str] = TECH_FIELDS, after: int | None = None,
+                         chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[dict]]:
+    """
+    Yield the given Tech columns in keyset-paginated chunks.
+    """
+    while True:
+        chunk = await read_tech_rows(db, fields, limit=chunk_size, after=after)
+        if not chunk:
+            return
+        yield chunk
+        after = chunk[-1]["tech_id"]
+
+async def update_tech(db: AsyncSession, tech_id: int, data: TechUpdateSchema) -> Tech | None:
+    """
+    Update an existing Tech object in the database.
+    """
+    tech: Tech | None = await db.get(Tech, tech_id)
+    if not tech:
+        return None
+
+    update_data = data.model_dump(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(tech, key, value)
+
+    await db.commit()
+    _invalidate_tech(tech_id)
+    await db.refresh(tech)
+    return tech
+
+async def delete_tech(db: AsyncSession, tech_id: int) -> None:
+    """
+    Delete a Tech object from the database.
+    """
+    tech = await db.get(Tech, tech_id)
+
+    if not tech:
+        raise HTTPException(status_code=404, detail="Tech does not found.")
+
+    await db.delete(tech)
+    await db.commit()
+    _invalidate_tech(tech_id)
+
+### Project CRUD
+async def _load_project(db: AsyncSession, project_id: int) -> Project | None:
+    return await db.get(Project, project_id, options=[selectinload(Project.techs)], populate_existing=True)
+
+async def create_project(db: AsyncSession, data: ProjectCreateSchema) -> Project:
+    """
+    Create a new Project object and save it to the database.
+    """
+    project = Project(
+        name = data.name,
+        description = data.description,
+    )
+
+    db.add(project)
+    await db.commit()
+    return await _load_project(db, project.project_id)
+
+async def read_project(db: AsyncSession, project_id: int) -> Project | None:
+    """
+    Get a Project object by its ID.
+    """
+    return await _load_project(db, project_id)
+
+async def read_project_payload(db: AsyncSession, project_id: int, fields: Sequence[str] | None = None,
+                               include_techs: bool = False) -> tuple[bytes, str] | None:
+    """
+    Get a serialized Project and its ETag through the entity cache.
+
+    Requests for a subset of the fields bypass the cache; techs are then only embedded with include_techs.
+    """
+    if fields is not None:
+        project = await read_project_fields(db, project_id, fields, include_techs)
+        return _payload(project) if project else None
+
+    async def load() -> bytes | None:
+        project = await read_project(db, project_id)
+        return ProjectReadSchema.model_validate(project).model_dump_json().encode() if project else None
+
+    return await project_cache.aget_or_load(project_id, load)
+
+async def read_all_project(db: AsyncSession, limit: int | None = None, after: int | None = None,
+                           tech_ids: Sequence[int] = (), match: str = "all") -> List[Project]:
+    """
+    Get Project objects ordered by ID, optionally one keyset page at a time and filtered by tech.
+    """
+    return (await db.scalars(project_page_query(limit, after, tech_ids, match))).all()  #type: ignore
+
+async def iter_all_project(db: AsyncSession, after: int | None = None, tech_ids: Sequence[int] = (),
+                           match: str = "all",
+                           chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[Project]]:
+    """
+    Yield all Project objects in keyset-paginated chunks.
+    """
+    while True:
+        chunk = await read_all_project(db, limit=chunk_size, after=after, tech_ids=tech_ids, match=match)
+        if not chunk:
+            return
+        yield chunk
+        after = chunk[-1].project_id
+        db.expunge_all()
+
+async def _with_techs(db: AsyncSession, projects: List[dict]) -> List[dict]:
+    ids = [project["project_id"] for project in projects]
+    tech_rows = []
+    for i in range(0, len(ids), BULK_QUERY_CHUNK):
+        tech_rows.extend(await db.execute(project_techs_query(ids[i:i + BULK_QUERY_CHUNK])))
+    return attach_techs(projects, tech_rows)
+
+async def read_project_rows(db: AsyncSession, fields: Sequence[str] = PROJECT_FIELDS, include_techs: bool = True,
+                            limit: int | None = None, after: int | None = None, tech_ids: Sequence[int] = (),
+                            match: str = "all") -> List[dict]:
+    """
+    Get the given Project columns as dicts ordered by ID, with their techs only when include_techs is set.
+    """
+    result = await db.execute(project_rows_query(fields, limit, after, tech_ids, match))
+    projects = [dict(row) for row in result.mappings()]
+    return await _with_techs(db, projects) if include_techs else projects
+
+async def read_project_fields(db: AsyncSession, project_id: int, fields: Sequence[str] = PROJECT_FIELDS,
+                              include_techs: bool = True) -> dict | None:
+    """
+    Get the given columns of a single Project as a dict, with its techs only when include_techs is set.
+    """
+    result = await db.execute(
+        select(*_columns(Project, fields, "project_id")).where(Project.project_id == project_id)
+    )
+    row = result.mappings().first()
+    if not row:
+        return None
+    project = dict(row)
+    return (await _with_techs(db, [project]))[0] if include_techs else project
+
+async def iter_project_rows(db: AsyncSession, fields: Sequence[str] = PROJECT_FIELDS, include_techs: bool = True,
+                            after: int | None = None, tech_ids: Sequence[int] = (), match: str = "all",
+                            chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[dict]]:
+    """
+    Yield the given Project columns in keyset-paginated chunks.
+    """
+    while True:
+        chunk = await read_project_rows(db, fields, include_techs, limit=chunk_size, after=after,
+                                        tech_ids=tech_ids, match=match)
+        if not chunk:
+            return
+        yield chunk
+        after = chunk[-1]["project_id"]
+
+async def update_project(db: AsyncSession, project_id: int, data: ProjectUpdateSchema) -> Project | None:
+    """
+    Update an existing Project object in the database.
+    """
+    project: Project | None = await db.get(Project, project_id)
+    if not project:
+        return None
+
+    update_data = data.model_dump(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(project, key, value)
+
+    await db.commit()
+    _invalidate_project(project_id)
+    return await _load_project(db, project_id)
+
+async def delete_project(db: AsyncSession, project_id: int) -> None:
+    """
+    Delete a Project object from the database.
+    """
+    project = await db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    await db.delete(project)
+    await db.commit()
+    _invalidate_project(project_id)
+
+async def link_techs_to_project(db: AsyncSession, project_id: int, tech_ids: list[int],
+                                mode: str = "add") -> dict | None:
+    """
+    Add, remove or replace the techs linked to a Project, see src.crud.link_techs_to_project.
+    """
+    if await db.get(Project, project_id) is None:
+        return None
+
+    requested = set(tech_ids)
+    ids = list(requested)
+    known = set()
+    for i in range(0, len(ids), BULK_QUERY_CHUNK):
+        known.update(await db.scalars(select(Tech.tech_id).where(Tech.tech_id.in_(ids[i:i + BULK_QUERY_CHUNK]))))
+
+    current = set(await db.scalars(select(project_techs.c.tech_id).where(project_techs.c.project_id == project_id)))
+
+    to_add, to_remove = plan_link_changes(requested, known, current, mode)
+    if to_add:
+        await db.execute(insert(project_techs).prefix_with("OR IGNORE", dialect="sqlite"),
+                         [{"project_id": project_id, "tech_id": tech_id} for tech_id in to_add])
+    removed = list(to_remove)
+    for i in range(0, len(removed), BULK_QUERY_CHUNK):
+        await db.execute(delete(project_techs).where(project_techs.c.project_id == project_id,
+                                                     project_techs.c.tech_id.in_(removed[i:i + BULK_QUERY_CHUNK])))
+    await db.commit()
+    _invalidate_project(project_id)
+
+    return {
+        "project": await _load_project(db, project_id),
+        "added_tech_ids": sorted(to_add),
+        "removed_tech_ids": sorted(to_remove),
+        "unknown_tech_ids": sorted(requested - known),
+    }
@@ -1,20 +1,206 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import os
+from typing import Callable
+from urllib.parse import quote
 
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session as OrmSession, sessionmaker
+from sqlalchemy.schema import CreateColumn
+
+from src.metrics import instrument_engine
 from src.models import Base
 
-SQLALCHEMY_DATABASE_URL = 'sqlite:///database.db'
+# ENV
+load_dotenv()
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///database.db")
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Serve the catalog CRUD routes from async endpoints on an AsyncEngine (needs an async driver, e.g. aiosqlite)
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+SQLALCHEMY_ASYNC_DATABASE_URL = os.getenv("DATABASE_ASYNC_URL")
+# Read-only engine for the GET routes, with its own pool so reads never wait for a connection behind writers.
+# SQLite files get a `mode=ro` connection to the same file by default; set DATABASE_READ_URL to read elsewhere.
+SQLALCHEMY_READ_DATABASE_URL = os.getenv("DATABASE_READ_URL")
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "20"))
+DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", "20"))
+# Create missing tables on startup; otherwise run `python cli.py init-db` once per database
+DB_CREATE_SCHEMA = os.getenv("DB_CREATE_SCHEMA", "false").lower() in ("1", "true", "yes")
+
+# SQLite pragmas applied to every new connection
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # negative = KiB, so 64 MiB
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+
+_url = make_url(SQLALCHEMY_DATABASE_URL)
+_is_sqlite = _url.get_backend_name() == "sqlite"
+# In-memory SQLite uses a single-connection pool that takes no sizing options
+_pool_options = {} if _is_sqlite and _url.database in (None, "", ":memory:") else {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+}
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def _set_sqlite_read_pragmas(dbapi_connection, connection_record):
+    # journal_mode and synchronous belong to the writers; a read-only connection can't change them
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        if name not in ("journal_mode", "synchronous"):
+            cursor.execute(f"PRAGMA {name}={value}")
+    cursor.execute("PRAGMA query_only=1")
+    cursor.close()
+
+if SQLALCHEMY_READ_DATABASE_URL:
+    _read_url = make_url(SQLALCHEMY_READ_DATABASE_URL)
+elif _pool_options and _is_sqlite:
+    # In WAL mode every read-only connection reads its own snapshot, next to the writer
+    _read_url = make_url(f"sqlite:///file:{quote(_url.database)}?mode=ro&uri=true")
+else:
+    _read_url = None  # in-memory SQLite and other databases read through the main engine
+_read_is_sqlite = _read_url is not None and _read_url.get_backend_name() == "sqlite"
+
+# Engine, created on first use so importing this module doesn't touch the database
+_engine = None
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            _url,
+            connect_args={"check_same_thread": False} if _is_sqlite else {},
+            echo=DB_ECHO,
+            pool_pre_ping=not _is_sqlite,
+            **_pool_options,
+        )
+        if _is_sqlite:
+            event.listen(_engine, "connect", _set_sqlite_pragmas)
+        instrument_engine(_engine)
+    return _engine
+
+_read_engine = None
+
+def get_read_engine():
+    """
+    The engine behind get_read_db: a separate read-only engine when there is one, otherwise the main engine.
+    """
+    global _read_engine
+    if _read_url is None:
+        return get_engine()
+    if _read_engine is None:
+        _read_engine = create_engine(
+            _read_url,
+            connect_args={"check_same_thread": False} if _read_is_sqlite else {},
+            echo=DB_ECHO,
+            pool_pre_ping=not _read_is_sqlite,
+            pool_size=DB_READ_POOL_SIZE,
+            max_overflow=DB_READ_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+        if _read_is_sqlite:
+            event.listen(_read_engine, "connect", _set_sqlite_read_pragmas)
+        instrument_engine(_read_engine)
+    return _read_engine
+
+def __getattr__(name: str):
+    # Keeps `from src.database import engine` working without creating the engine at import time
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def describe_engine() -> str:
+    """
+    One-line summary of the effective engine settings, for the startup log.
+    """
+    summary = (f"Database engine: url={_url.render_as_string(hide_password=True)} echo={DB_ECHO} "
+               f"pool={type(get_engine().pool).__name__} {_pool_options}")
+    if _is_sqlite:
+        summary += f" pragmas={SQLITE_PRAGMAS}"
+    if _read_url is not None:
+        summary += (f" read_url={_read_url.render_as_string(hide_password=True)} "
+                    f"read_pool={{'pool_size': {DB_READ_POOL_SIZE}, 'max_overflow': {DB_READ_MAX_OVERFLOW}}}")
+    return summary
+
+def _add_missing_columns(engine) -> list[str]:
+    """
+    Add the columns that models gained after their table was created, returning them as "table.column".
+
+    Such columns need a server default, so that the existing rows get a value.
+    """
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    added = []
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+                    added.append(f"{table.name}.{column.name}")
+    return added
+
+def init_db(engine=None) -> list[str]:
+    """
+    Bring the database schema up to date, returning the names of the upgrade steps it ran.
+
+    Creates any missing tables, columns, indexes and triggers. create_all only creates columns and indexes
+    along with their table, so the ones added to existing tables later are created here as well, columns
+    first since the triggers refer to them. The data behind new columns is then filled in by the same
+    commands that rebuild it, and refresh tokens from before digests are converted.
+    """
+    from src.commands import (rebuild_change_log, rebuild_tech_counts, refresh_tokens_need_upgrade,
+                              upgrade_refresh_tokens)
+
+    engine = engine or get_engine()
+    added = _add_missing_columns(engine)
+    Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=True
-)
+    upgrades = []
+    if "techs.project_count" in added:
+        upgrades.append(rebuild_tech_counts)
+    if "techs.change_version" in added or "projects.change_version" in added:
+        upgrades.append(rebuild_change_log)
+    if refresh_tokens_need_upgrade(engine):
+        upgrades.append(upgrade_refresh_tokens)
+    for upgrade in upgrades:
+        with OrmSession(bind=engine) as db:
+            upgrade(db)
+    return [upgrade.__name__ for upgrade in upgrades]
 
-Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+class LazySessionmaker(sessionmaker):
+    """
+    sessionmaker that binds itself to the engine the first time a session is made.
+    """
 
-# Create database if not exists
-Base.metadata.create_all(bind=engine)
+    def __init__(self, engine_factory: Callable = get_engine, **kw):
+        super().__init__(**kw)
+        self.engine_factory = engine_factory
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=self.engine_factory())
+        return super().__call__(**local_kw)
+
+
+Session = LazySessionmaker(autocommit=False, autoflush=False)
+ReadSession = LazySessionmaker(get_read_engine, autocommit=False, autoflush=False)
 
 # Session generator for Fast API
 def get_db():
@@ -22,4 +208,63 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Read-only session generator for the GET routes
+def get_read_db():
+    db = ReadSession()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Async engine, created on first use so the async driver is only imported when DB_ASYNC is on
+_async_session = None
+
+def get_async_sessionmaker():
+    global _async_session
+    if _async_session is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+        if SQLALCHEMY_ASYNC_DATABASE_URL:
+            async_url = make_url(SQLALCHEMY_ASYNC_DATABASE_URL)
+        elif _is_sqlite:
+            async_url = _url.set(drivername="sqlite+aiosqlite")
+        else:
+            raise RuntimeError("DATABASE_ASYNC_URL must be set for non-SQLite databases")
+
+        async_engine = create_async_engine(
+            async_url,
+            echo=DB_ECHO,
+            poolclass=AsyncAdaptedQueuePool if _pool_options else None,
+            **_pool_options,
+        )
+        if _is_sqlite:
+            event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+        instrument_engine(async_engine.sync_engine)
+
+        # Lazy loading is not available on an AsyncSession, so nothing may expire after a commit
+        _async_session = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    return _async_session
+
+# Async session generator for Fast API
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+async def dispose_engines() -> None:
+    """
+    Close the pooled connections of every engine created so far.
+    """
+    global _engine, _read_engine, _async_session
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+    if _read_engine is not None:
+        _read_engine.dispose()
+        _read_engine = None
+    if _async_session is not None:
+        await _async_session.kw["bind"].dispose()
+        _async_session = None
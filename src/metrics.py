@@ -0,0 +1,222 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+# ENV
+load_dotenv()
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Add a Server-Timing header (app, db, bcrypt, jwt) to every response, for browser dev tools and curl -v
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestStats:
+    """
+    Work done on behalf of the current request, collected through a context variable.
+
+    Sync endpoints run in a worker thread with a copy of the request context, so they share this object.
+    """
+    __slots__ = ("sql_count", "sql_seconds", "sql_started", "bcrypt_seconds", "jwt_seconds")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.sql_started = 0.0
+        self.bcrypt_seconds = 0.0
+        self.jwt_seconds = 0.0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, label_values: tuple, value: float) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series.setdefault(label_values, [0] * len(self.buckets) + [0.0, 0])
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self._series.items()):
+            labels = _format_labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series: dict[tuple, float] = {}
+
+    def inc(self, label_values: tuple, value: float = 1) -> None:
+        self._series[label_values] = self._series.get(label_values, 0) + value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{{{_format_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    return ",".join(f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                    for name, value in zip(names, values))
+
+
+class MetricsRegistry:
+    """
+    Process-wide request metrics, rendered in the Prometheus text format.
+
+    A single lock guards all series; each request takes it once, after the response has been sent.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter("vaultcore_http_requests_total", "HTTP requests handled.",
+                                ("method", "route", "status"))
+        self.latency = Histogram("vaultcore_http_request_duration_seconds", "Time to send the full response.",
+                                 ("method", "route"), LATENCY_BUCKETS)
+        self.response_size = Histogram("vaultcore_http_response_size_bytes", "Response body size.",
+                                       ("method", "route"), SIZE_BUCKETS)
+        self.statements = Histogram("vaultcore_db_statements_per_request", "SQL statements run per request.",
+                                    ("method", "route"), STATEMENT_BUCKETS)
+        self.sql_seconds = Counter("vaultcore_db_statement_seconds_total", "Time spent executing SQL statements.",
+                                   ("method", "route"))
+        self.auth_seconds = Counter("vaultcore_auth_seconds_total",
+                                    "Time spent in password hashing (including queueing) and JWT work.",
+                                    ("method", "route", "operation"))
+
+    def record(self, method: str, route: str, status: int, seconds: float, size: int, stats: RequestStats) -> None:
+        labels = (method, route)
+        with self._lock:
+            self.requests.inc((method, route, status))
+            self.latency.observe(labels, seconds)
+            self.response_size.observe(labels, size)
+            self.statements.observe(labels, stats.sql_count)
+            self.sql_seconds.inc(labels, stats.sql_seconds)
+            if stats.bcrypt_seconds:
+                self.auth_seconds.inc((method, route, "bcrypt"), stats.bcrypt_seconds)
+            if stats.jwt_seconds:
+                self.auth_seconds.inc((method, route, "jwt"), stats.jwt_seconds)
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.latency, self.response_size, self.statements, self.sql_seconds,
+                           self.auth_seconds):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def record_bcrypt_time(seconds: float) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.bcrypt_seconds += seconds
+
+def record_jwt_time(seconds: float) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.jwt_seconds += seconds
+
+
+# SQL statement hooks
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.sql_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_seconds += time.perf_counter() - stats.sql_started
+
+def instrument_engine(engine) -> None:
+    """
+    Count and time the SQL statements a (sync) engine runs for the current request.
+    """
+    if METRICS_ENABLED:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+
+def _server_timing(elapsed: float, stats: RequestStats) -> bytes:
+    return (f'app;dur={elapsed * 1000:.2f}, db;dur={stats.sql_seconds * 1000:.2f};desc="{stats.sql_count} queries", '
+            f"bcrypt;dur={stats.bcrypt_seconds * 1000:.2f}, jwt;dur={stats.jwt_seconds * 1000:.2f}").encode()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, response size, SQL statements and auth work per route template.
+
+    Server-Timing is sent with the response headers, so it doesn't cover work done while streaming the body.
+    """
+
+    def __init__(self, app, server_timing: bool = SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(time.perf_counter() - started, stats)))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            registry.record(scope["method"], _route_template(scope), status, time.perf_counter() - started, size,
+                            stats)
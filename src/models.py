@@ -2,7 +2,7 @@ from datetime import datetime, timedelta, timezone
 from typing import List
 from typing import Optional
 import enum
-from sqlalchemy import String, ForeignKey, Table, Column, Integer, Enum, DateTime
+from sqlalchemy import String, ForeignKey, Table, Column, Integer, Enum, DateTime, LargeBinary, DDL, Index, event
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
@@ -17,7 +17,9 @@ project_techs = Table(
     'project_techs',
     Base.metadata,
     Column('project_id', Integer, ForeignKey('projects.project_id'), primary_key=True),
-    Column('tech_id', Integer, ForeignKey('techs.tech_id'), primary_key=True)
+    Column('tech_id', Integer, ForeignKey('techs.tech_id'), primary_key=True),
+    # Reverse covering index for "projects using tech X" lookups
+    Index('ix_project_techs_tech_id_project_id', 'tech_id', 'project_id')
 )
 
 
@@ -27,6 +29,8 @@ class Tech(Base):
     tech_id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(50), unique=True)
     description: Mapped[Optional[str]]
+    change_version: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+    project_count: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)  # kept by triggers
 
     projects: Mapped[List["Project"]] = relationship(secondary=project_techs, back_populates='techs')
 
@@ -37,10 +41,102 @@ class Project(Base):
     project_id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(100), unique=True)
     description: Mapped[Optional[str]]
+    change_version: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
 
     techs: Mapped[List["Tech"]] = relationship(secondary=project_techs, back_populates='projects')
 
 
+# Top-K index for GET /techs/popular: the most used techs are read straight off its first entries
+ix_techs_project_count = Index('ix_techs_project_count', Tech.project_count.desc(), Tech.tech_id)
+
+# Usage counters: keep techs.project_count equal to the number of links of each tech (SQLite only).
+# Counts created before these existed, or that drifted, are fixed with `python cli.py rebuild-tech-counts`.
+_usage_ddl = [
+    "CREATE TRIGGER IF NOT EXISTS project_techs_count_ai AFTER INSERT ON project_techs BEGIN "
+    "UPDATE techs SET project_count = project_count + 1 WHERE tech_id = new.tech_id; END",
+    "CREATE TRIGGER IF NOT EXISTS project_techs_count_ad AFTER DELETE ON project_techs BEGIN "
+    "UPDATE techs SET project_count = project_count - 1 WHERE tech_id = old.tech_id; END",
+]
+
+for _statement in _usage_ddl:
+    event.listen(Base.metadata, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+
+# Full-text search: FTS5 indexes over techs and projects, kept in sync by triggers (SQLite only).
+# Tables created before these existed are filled with `python cli.py rebuild-search-index`.
+def _fts_ddl(table: str, key: str) -> list[str]:
+    fts = f"{table}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(name, description, content='{table}', "
+        f"content_rowid='{key}', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, name, description) VALUES (new.{key}, new.name, new.description); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, name, description) VALUES ('delete', old.{key}, old.name, old.description); "
+        f"END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name, description ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, name, description) VALUES ('delete', old.{key}, old.name, old.description); "
+        f"INSERT INTO {fts}(rowid, name, description) VALUES (new.{key}, new.name, new.description); END",
+    ]
+
+for _statement in _fts_ddl('techs', 'tech_id') + _fts_ddl('projects', 'project_id'):
+    event.listen(Base.metadata, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+
+class CatalogChange(Base):
+    """
+    Change log behind GET /changes, holding only the latest change of every tech, project and link.
+
+    Rows are written by triggers (SQLite only). Each new change replaces the previous row for the same
+    entity under a new, higher version, so reading everything after a version costs only what changed since.
+    """
+    __tablename__ = 'catalog_changes'
+    __table_args__ = (
+        Index('ux_catalog_changes_entity', 'entity', 'entity_id', 'related_id', unique=True),
+        {'sqlite_autoincrement': True},  # versions are never reused, even after the newest row is replaced
+    )
+
+    version: Mapped[int] = mapped_column(primary_key=True)
+    entity: Mapped[str] = mapped_column(String(10), nullable=False)  # 'tech', 'project' or 'link'
+    entity_id: Mapped[int] = mapped_column(nullable=False)  # tech_id, project_id, or project_id for links
+    related_id: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)  # tech_id for links
+    op: Mapped[str] = mapped_column(String(10), nullable=False)  # 'upsert', 'delete', 'link' or 'unlink'
+
+
+# Change log triggers: record every write to techs, projects and project_techs in catalog_changes,
+# and stamp the written row with its change version. Deletes leave a 'delete' row behind as a tombstone.
+def _change_ddl(table: str, key: str, entity: str) -> list[str]:
+    def record(op: str, row: str) -> str:
+        return (f"INSERT OR REPLACE INTO catalog_changes(entity, entity_id, related_id, op) "
+                f"VALUES ('{entity}', {row}.{key}, 0, '{op}');")
+
+    stamp = f"UPDATE {table} SET change_version = last_insert_rowid() WHERE {key} = new.{key};"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_changes_ai AFTER INSERT ON {table} BEGIN "
+        f"{record('upsert', 'new')} {stamp} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_changes_au AFTER UPDATE OF name, description ON {table} BEGIN "
+        f"{record('upsert', 'new')} {stamp} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_changes_ad AFTER DELETE ON {table} BEGIN "
+        f"{record('delete', 'old')} END",
+    ]
+
+def _link_change_ddl() -> list[str]:
+    def record(op: str, row: str) -> str:
+        return (f"INSERT OR REPLACE INTO catalog_changes(entity, entity_id, related_id, op) "
+                f"VALUES ('link', {row}.project_id, {row}.tech_id, '{op}');")
+
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS project_techs_changes_ai AFTER INSERT ON project_techs BEGIN "
+        f"{record('link', 'new')} END",
+        f"CREATE TRIGGER IF NOT EXISTS project_techs_changes_ad AFTER DELETE ON project_techs BEGIN "
+        f"{record('unlink', 'old')} END",
+    ]
+
+for _statement in _change_ddl('techs', 'tech_id', 'tech') + _change_ddl('projects', 'project_id', 'project') + \
+        _link_change_ddl():
+    event.listen(Base.metadata, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+
 class UserRole(enum.Enum):
     ADMIN = 'admin'
     EDITOR = 'editor'
@@ -59,6 +155,7 @@ class User(Base):
         nullable=False,
         server_default=str(UserRole.USER)
     )
+    token_version: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
 
 
 class RefreshToken(Base):
@@ -66,10 +163,10 @@ class RefreshToken(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.user_id'), nullable=False)
-    token: Mapped[str] = mapped_column(String(250), nullable=False, index=True)
+    token: Mapped[bytes] = mapped_column(LargeBinary(32), nullable=False, unique=True)  # SHA-256 digest
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
                                                  nullable=False)
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
                                                  default=lambda: datetime.now(timezone.utc) + timedelta(days=3),
-                                                 nullable=False)
-    active: Mapped[bool] = mapped_column(default=True, nullable=False)
+                                                 nullable=False, index=True)
+    active: Mapped[bool] = mapped_column(default=True, nullable=False, index=True)
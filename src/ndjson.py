@@ -0,0 +1,83 @@
+import zlib
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List
+
+from fastapi import HTTPException
+
+from src.serialization import dump_plain, load_plain
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_MAX_LINE_BYTES = 1024 * 1024
+GZIP_LEVEL = 6
+_GZIP_WBITS = 31  # zlib window bits selecting the gzip container
+_INFLATE_CHUNK = 1024 * 1024
+
+
+def encode_lines(rows: List[dict]) -> bytes:
+    """
+    Encode rows as NDJSON, one JSON document per line.
+    """
+    return b"".join(dump_plain(row) + b"\n" for row in rows)
+
+def stream_ndjson(chunks: Iterable[List[dict]]) -> Iterator[bytes]:
+    """
+    Serialize chunks of rows into an NDJSON stream, one chunk at a time.
+    """
+    for chunk in chunks:
+        if chunk:
+            yield encode_lines(chunk)
+
+def gzip_stream(chunks: Iterable[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    """
+    Compress a byte stream into a single gzip member as it is produced.
+    """
+    compressor = zlib.compressobj(level, wbits=_GZIP_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def _inflate(decompressor, chunk: bytes) -> Iterator[bytes]:
+    # Bounded output per call, so a small, highly compressed body can't expand in one go
+    yield decompressor.decompress(chunk, _INFLATE_CHUNK)
+    while decompressor.unconsumed_tail:
+        yield decompressor.decompress(decompressor.unconsumed_tail, _INFLATE_CHUNK)
+
+async def aiter_ndjson(chunks: AsyncIterable[bytes], gzip: bool = False,
+                       max_line_bytes: int = NDJSON_MAX_LINE_BYTES) -> AsyncIterator[tuple[int, dict]]:
+    """
+    Parse a (optionally gzip-compressed) NDJSON request body into (line number, object) pairs.
+
+    Only the current line is held in memory. Blank lines are skipped; anything else that isn't
+    a JSON object is rejected with a 400 naming the line.
+    """
+    decompressor = zlib.decompressobj(wbits=_GZIP_WBITS) if gzip else None
+    pending = b""
+    line_no = 0
+
+    async for chunk in chunks:
+        try:
+            pieces = _inflate(decompressor, chunk) if decompressor else (chunk,)
+            for piece in pieces:
+                lines = (pending + piece).split(b"\n")
+                pending = lines.pop()
+                if len(pending) > max_line_bytes:
+                    raise HTTPException(status_code=400, detail=f"Line {line_no + len(lines) + 1}: line too long")
+                for line in lines:
+                    line_no += 1
+                    if line.strip():
+                        yield line_no, _parse_line(line_no, line)
+        except zlib.error:
+            raise HTTPException(status_code=400, detail="Request body is not valid gzip")
+
+    if pending.strip():
+        yield line_no + 1, _parse_line(line_no + 1, pending)
+
+def _parse_line(line_no: int, line: bytes) -> dict:
+    try:
+        record = load_plain(line)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Line {line_no}: invalid JSON")
+    if not isinstance(record, dict):
+        raise HTTPException(status_code=400, detail=f"Line {line_no}: expected a JSON object")
+    return record
@@ -0,0 +1,44 @@
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Type
+
+from pydantic import BaseModel
+
+from src.serialization import dump_list
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 500
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _serialize_chunk(chunk: List, schema: Type[BaseModel] | None) -> bytes:
+    return dump_list(chunk, schema)[1:-1]
+
+def stream_json_array(chunks: Iterable[List], schema: Type[BaseModel] | None = None) -> Iterator[bytes]:
+    """
+    Serialize chunks of ORM objects (or of row dicts, without a schema) into a JSON array, one chunk at a time.
+    """
+    yield b"["
+    first = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        body = _serialize_chunk(chunk, schema)
+        yield body if first else b"," + body
+        first = False
+    yield b"]"
+
+async def astream_json_array(chunks: AsyncIterable[List],
+                             schema: Type[BaseModel] | None = None) -> AsyncIterator[bytes]:
+    """
+    Async variant of stream_json_array.
+    """
+    yield b"["
+    first = True
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        body = _serialize_chunk(chunk, schema)
+        yield body if first else b"," + body
+        first = False
+    yield b"]"
@@ -0,0 +1,130 @@
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request
+
+from src.schemas import UserLoginSchema, UserRegisterSchema
+
+# ENV
+load_dotenv()
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+# Token bucket rates as "<requests>/<seconds>": a burst of <requests>, refilled evenly over <seconds>
+AUTH_LOGIN_RATE_PER_IP = os.getenv("AUTH_LOGIN_RATE_PER_IP", "20/60")
+AUTH_LOGIN_RATE_PER_USERNAME = os.getenv("AUTH_LOGIN_RATE_PER_USERNAME", "5/60")
+AUTH_REGISTER_RATE_PER_IP = os.getenv("AUTH_REGISTER_RATE_PER_IP", "5/60")
+# Buckets kept by the in-memory storage; the least recently used are dropped (i.e. refilled) beyond this
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+
+def parse_rate(rate: str) -> tuple[float, float]:
+    """
+    Parse "<requests>/<seconds>" into a bucket capacity and a refill rate in tokens per second.
+    """
+    try:
+        requests, seconds = (float(part) for part in rate.split("/"))
+    except ValueError:
+        raise RuntimeError(f"Rate limits must look like '<requests>/<seconds>', got {rate!r}") from None
+    if requests < 1 or seconds <= 0:
+        raise RuntimeError(f"Rate limit {rate!r} must allow at least one request over a positive period")
+    return requests, requests / seconds
+
+
+class RateLimitStorage(ABC):
+    """
+    Where token buckets live. Subclass it to share limits between workers, e.g. in Redis.
+    """
+
+    @abstractmethod
+    def take(self, key: str, capacity: float, refill_rate: float, now: float) -> float:
+        """
+        Take a token from bucket `key`. Returns 0 if one was available, otherwise the seconds until there is one.
+        """
+
+
+class MemoryRateLimitStorage(RateLimitStorage):
+    """
+    Per-process buckets in a bounded LRU dict, so each worker enforces its own share of the limit.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()  # key -> (tokens, updated at)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, refill_rate: float, now: float) -> float:
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / refill_rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RateLimiter:
+    """
+    Named token buckets checked before any password work, so rejected requests never reach bcrypt.
+    """
+
+    def __init__(self, storage: RateLimitStorage | None = None, enabled: bool = RATE_LIMIT_ENABLED):
+        self.storage = storage or MemoryRateLimitStorage()
+        self.enabled = enabled
+        self._limits: dict[str, tuple[float, float]] = {}
+        self._rejected: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, name: str, rate: str) -> None:
+        self._limits[name] = parse_rate(rate)
+        self._rejected.setdefault(name, 0)
+
+    def hit(self, name: str, key: str) -> None:
+        """
+        Take a token from the `name` bucket of `key`, or raise a 429 with a Retry-After header.
+        """
+        if not self.enabled:
+            return
+        capacity, refill_rate = self._limits[name]
+        wait = self.storage.take(f"{name}:{key}", capacity, refill_rate, time.time())
+        if wait:
+            with self._lock:
+                self._rejected[name] += 1
+            raise HTTPException(status_code=429, detail="Too many attempts, try again later.",
+                                headers={"Retry-After": str(math.ceil(wait))})
+
+    def metrics(self) -> dict[str, int]:
+        """
+        Snapshot of the rejected requests per bucket name.
+        """
+        with self._lock:
+            return dict(self._rejected)
+
+
+auth_rate_limiter = RateLimiter()
+auth_rate_limiter.configure("login_ip", AUTH_LOGIN_RATE_PER_IP)
+auth_rate_limiter.configure("login_username", AUTH_LOGIN_RATE_PER_USERNAME)
+auth_rate_limiter.configure("register_ip", AUTH_REGISTER_RATE_PER_IP)
+
+
+def _client_ip(request: Request) -> str:
+    # Behind a proxy, run uvicorn with --proxy-headers so this is the real client address
+    return request.client.host if request.client else "unknown"
+
+
+# Dependencies for the /auth routes. They are async so a rejection is answered on the event loop,
+# before a database session is opened or a worker thread is taken.
+async def limit_login(request: Request, user_data: UserLoginSchema) -> None:
+    auth_rate_limiter.hit("login_ip", _client_ip(request))
+    auth_rate_limiter.hit("login_username", user_data.username.lower())
+
+async def limit_register(request: Request, user_data: UserRegisterSchema) -> None:
+    auth_rate_limiter.hit("register_ip", _client_ip(request))
@@ -0,0 +1,128 @@
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import User, UserRole
+from src.cache import etag_matches
+from src.crud import PROJECT_FIELDS
+from src.crud_async import (create_project, read_project_payload, read_project_rows, iter_project_rows,
+                            update_project, delete_project, link_techs_to_project)
+from src.schemas import ProjectCreateSchema, ProjectReadSchema, ProjectUpdateSchema, ProjectTechLinkResultSchema
+from src.database import get_async_db
+from src.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, astream_json_array
+from src.security import get_current_user_async
+from src.serialization import list_response, parse_fields
+
+# Async versions of the core Project routes, mounted ahead of project_router when DB_ASYNC is on.
+# Paths use the int convertor so that other routes under /projects/ still reach project_router.
+async_project_router = APIRouter(prefix="/projects", tags=["Projects"])
+
+# Create Project
+@async_project_router.post("/", response_model=ProjectReadSchema, status_code=201)
+async def create_project_endpoint_async(data: ProjectCreateSchema, db: AsyncSession = Depends(get_async_db),
+                                        current_user: User = Depends(get_current_user_async)):
+    """
+    Create a new Project object.
+    """
+    if not current_user.role in [UserRole.ADMIN, UserRole.EDITOR]:
+        raise HTTPException(status_code=403, detail="You are not allowed to create projects.")
+    return await create_project(db, data)
+
+# Read single Project
+@async_project_router.get("/{project_id:int}", response_model=ProjectReadSchema, status_code=200)
+async def read_project_endpoint_async(project_id: int, fields: str | None = None,
+                                      include: Literal["techs"] | None = None,
+                                      if_none_match: str | None = Header(None),
+                                      db: AsyncSession = Depends(get_async_db)):
+    """
+    Get a Project by ID.
+
+    Responses carry an ETag; a matching If-None-Match header gets a 304 without a body.
+    `fields` and `include` work as on GET /projects/.
+    """
+    selected = parse_fields(fields, PROJECT_FIELDS) if fields is not None else None
+    entry = await read_project_payload(db, project_id, selected, include_techs=include == "techs")
+    if not entry:
+        raise HTTPException(status_code=404, detail="Project not found")
+    body, etag = entry
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+# Read all Projects
+@async_project_router.get("/", response_model=List[ProjectReadSchema])
+async def read_all_project_endpoint_async(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                                          after: int | None = Query(None, ge=0),
+                                          tech: List[int] = Query(default=[]),
+                                          match: Literal["all", "any"] = "all",
+                                          fields: str | None = None,
+                                          include: Literal["techs"] | None = None,
+                                          stream: bool = False,
+                                          db: AsyncSession = Depends(get_async_db)):
+    """
+    Get Project objects ordered by ID, one page at a time.
+
+    Pass the X-Next-Cursor header value as `after` to fetch the next page.
+    Repeat `tech` to keep only projects using all of those Techs, or any of them with `match=any`.
+    With `stream=true` every Project after the cursor is streamed as a single JSON array.
+
+    `fields` is a comma-separated list of the fields to return (project_id is always included). Once `fields`
+    is given, techs are only embedded with `include=techs`.
+    """
+    selected = parse_fields(fields, PROJECT_FIELDS)
+    include_techs = fields is None or include == "techs"
+    if stream:
+        chunks = iter_project_rows(db, selected, include_techs, after=after, tech_ids=tech, match=match)
+        return StreamingResponse(astream_json_array(chunks), media_type="application/json")
+
+    projects = await read_project_rows(db, selected, include_techs, limit=limit, after=after, tech_ids=tech,
+                                       match=match)
+    headers = {NEXT_CURSOR_HEADER: str(projects[-1]["project_id"])} if len(projects) == limit else None
+    return list_response(projects, headers=headers)
+
+# Update Project
+@async_project_router.patch("/{project_id:int}", response_model=ProjectReadSchema, status_code=200)
+async def update_project_endpoint_async(project_id: int, data: ProjectUpdateSchema,
+                                        db: AsyncSession = Depends(get_async_db),
+                                        current_user: User = Depends(get_current_user_async)):
+    """
+    Update an existing Project object by ID.
+    """
+    if not current_user.role in [UserRole.ADMIN, UserRole.EDITOR]:
+        raise HTTPException(status_code=403, detail="You are not allowed to update projects.")
+    project = await update_project(db, project_id, data)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
+# Delete Project
+@async_project_router.delete("/{project_id:int}", status_code=204)
+async def delete_project_endpoint_async(project_id: int, db: AsyncSession = Depends(get_async_db),
+                                        current_user: User = Depends(get_current_user_async)):
+    """
+    Delete an existing Project object by ID.
+    """
+    if not current_user.role in [UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="You are not allowed to delete projects.")
+    await delete_project(db, project_id)
+
+# Link Techs to Project
+@async_project_router.put("/{project_id:int}/techs", response_model=ProjectTechLinkResultSchema, status_code=200)
+async def link_techs_to_project_endpoint_async(project_id: int, tech_ids: List[int],
+                                               mode: Literal["add", "remove", "replace"] = "add",
+                                               db: AsyncSession = Depends(get_async_db),
+                                               current_user: User = Depends(get_current_user_async)):
+    """
+    Add, remove or replace the Techs linked to a Project.
+
+    IDs that don't match any Tech are reported in `unknown_tech_ids`.
+    """
+    if not current_user.role in [UserRole.ADMIN, UserRole.EDITOR]:
+        raise HTTPException(status_code=403, detail="You are not allowed to update projects.")
+    result = await link_techs_to_project(db, project_id, tech_ids, mode)
+    if not result:
+        raise HTTPException(status_code=404, detail="Project not found")
+    project = ProjectReadSchema.model_validate(result.pop("project"))
+    return ProjectTechLinkResultSchema(**project.model_dump(), **result)
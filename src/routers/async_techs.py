@@ -0,0 +1,97 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.cache import etag_matches
+from src.crud import TECH_FIELDS
+from src.crud_async import (create_tech, read_tech_payload, read_tech_rows, iter_tech_rows, update_tech,
+                            delete_tech)
+from src.models import UserRole, User
+from src.schemas import TechCreateSchema, TechReadSchema, TechUpdateSchema
+from src.database import get_async_db
+from src.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, astream_json_array
+from src.security import get_current_user_async
+from src.serialization import list_response, parse_fields
+
+# Async versions of the core Tech routes, mounted ahead of techs_router when DB_ASYNC is on.
+# Paths use the int convertor so that other routes under /techs/ still reach techs_router.
+async_techs_router = APIRouter(prefix="/techs", tags=["Techs"])
+
+# Create Tech
+@async_techs_router.post("/", response_model=TechReadSchema, status_code=201)
+async def create_tech_endpoint_async(data: TechCreateSchema, db: AsyncSession = Depends(get_async_db),
+                                     current_user: User = Depends(get_current_user_async)):
+    """
+    Create a new Tech object.
+    """
+    if not current_user.role in [UserRole.ADMIN, UserRole.EDITOR]:
+        raise HTTPException(status_code=403, detail="You are not allowed to create techs.")
+    return await create_tech(db, data)
+
+# Read single Tech
+@async_techs_router.get("/{tech_id:int}", response_model=TechReadSchema, status_code=200)
+async def read_tech_endpoint_async(tech_id: int, fields: str | None = None, if_none_match: str | None = Header(None),
+                                   db: AsyncSession = Depends(get_async_db)):
+    """
+    Get a Tech object by ID.
+
+    Responses carry an ETag; a matching If-None-Match header gets a 304 without a body.
+    `fields` is a comma-separated list of the fields to return (tech_id is always included).
+    """
+    entry = await read_tech_payload(db, tech_id, parse_fields(fields, TECH_FIELDS) if fields is not None else None)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Tech not found")
+    body, etag = entry
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+# Read all Techs
+@async_techs_router.get("/", response_model=List[TechReadSchema])
+async def read_all_techs_endpoint_async(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                                        after: int | None = Query(None, ge=0),
+                                        fields: str | None = None,
+                                        stream: bool = False,
+                                        db: AsyncSession = Depends(get_async_db)):
+    """
+    Get Tech objects ordered by ID, one page at a time.
+
+    Pass the X-Next-Cursor header value as `after` to fetch the next page.
+    With `stream=true` every Tech after the cursor is streamed as a single JSON array.
+    `fields` is a comma-separated list of the fields to return (tech_id is always included).
+    """
+    selected = parse_fields(fields, TECH_FIELDS)
+    if stream:
+        return StreamingResponse(astream_json_array(iter_tech_rows(db, selected, after=after)),
+                                 media_type="application/json")
+
+    techs = await read_tech_rows(db, selected, limit=limit, after=after)
+    headers = {NEXT_CURSOR_HEADER: str(techs[-1]["tech_id"])} if len(techs) == limit else None
+    return list_response(techs, headers=headers)
+
+# Update Tech
+@async_techs_router.patch("/{tech_id:int}", response_model=TechReadSchema, status_code=200)
+async def update_tech_endpoint_async(tech_id: int, data: TechUpdateSchema, db: AsyncSession = Depends(get_async_db),
+                                     current_user: User = Depends(get_current_user_async)):
+    """
+    Update an existing Tech object by ID.
+    """
+    if not current_user.role in [UserRole.ADMIN, UserRole.EDITOR]:
+        raise HTTPException(status_code=403, detail="You are not allowed to update techs.")
+    tech = await update_tech(db, tech_id, data)
+    if not tech:
+        raise HTTPException(status_code=404, detail="Tech not found")
+    return tech
+
+# Delete Tech
+@async_techs_router.delete("/{tech_id:int}", status_code=204)
+async def delete_tech_endpoint_async(tech_id: int, db: AsyncSession = Depends(get_async_db),
+                                     current_user: User = Depends(get_current_user_async)):
+    """
+    Delete an existing Tech object by ID.
+    """
+    if not current_user.role in [UserRole.ADMIN]:
+        raise HTTPException(status_code=403, detail="You are not allowed to delete techs.")
+    await delete_tech(db, tech_id)
@@ -1,19 +1,21 @@
 from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from src.database import get_db
 from src.models import User, UserRole, RefreshToken
+from src.ratelimit import limit_login, limit_register
 from src.schemas import (UserRegisterSchema, UserReadSchema, UserLoginSchema, RefreshTokenSchema,
                          TokenResponseSchema)
-from src.security import (hash_password, create_access_token, create_refresh_token,
-                          validate_refresh_token, user_authentication)
+from src.security import (hash_password_async, create_access_token, create_refresh_token,
+                          consume_refresh_token, user_authentication, get_current_user, revoke_user_tokens)
 
 auth_router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
-def create_user(db: Session, user_data: UserRegisterSchema) -> User:
+def create_user(db: Session, user_data: UserRegisterSchema, password_hash: str) -> User:
     # Check the uniqueness of a username and email
     if db.query(User).filter(User.username == user_data.username).first() is not None:
         raise HTTPException(status_code=409, detail="Username already registered")
@@ -22,7 +24,7 @@ def create_user(db: Session, user_data: UserRegisterSchema) -> User:
 
     new_user = User(
         username=user_data.username,
-        password_hash=hash_password(user_data.password),
+        password_hash=password_hash,
         email=user_data.email,
         role=UserRole.USER
     )
@@ -34,12 +36,14 @@ def create_user(db: Session, user_data: UserRegisterSchema) -> User:
 
 
 # User Register (by User)
-@auth_router.post("/register", response_model=UserReadSchema, status_code=201)
-def register_user(user_data: UserRegisterSchema, db: Session = Depends(get_db)) -> User:
+@auth_router.post("/register", response_model=UserReadSchema, status_code=201,
+                  dependencies=[Depends(limit_register)])
+async def register_user(user_data: UserRegisterSchema, db: Session = Depends(get_db)) -> User:
     """
     Register a new user
     """
-    user = create_user(db, user_data)
+    password_hash = await hash_password_async(user_data.password)
+    user = await run_in_threadpool(create_user, db, user_data, password_hash)
     return user
 
 
@@ -48,67 +52,75 @@ def register_user(user_data: UserRegisterSchema, db: Session = Depends(get_db))
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 3
 
-@auth_router.post("/login", response_model=TokenResponseSchema, status_code=200)
-def user_login(user_data: UserLoginSchema, db: Session = Depends(get_db)) -> dict:
+@auth_router.post("/login", response_model=TokenResponseSchema, status_code=200,
+                  dependencies=[Depends(limit_login)])
+async def user_login(user_data: UserLoginSchema, db: Session = Depends(get_db)) -> dict:
     """
     Authenticate a user and return access and refresh tokens.
     """
-    user = user_authentication(user_data, db)
+    user = await user_authentication(user_data, db)
 
     # Token generation
     access_token = create_access_token(
         user.user_id,
-        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+        role=user.role,
+        token_version=user.token_version
     )
 
     # Refresh token generation
-    refresh_token_data = create_refresh_token(
+    refresh_token, refresh_token_data = create_refresh_token(
         user.user_id,
         expires_delta=timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     )
-    refresh_token = RefreshToken(**refresh_token_data)
     # Add refresh token to Db
-    db.add(refresh_token)
-    db.commit()
-    db.refresh(refresh_token)
+    db.add(RefreshToken(**refresh_token_data))
+    await run_in_threadpool(db.commit)
 
     return {
         "access_token": access_token,
-        "refresh_token": refresh_token.token,
+        "refresh_token": refresh_token,
         "token_type": "bearer"
     }
 
 
 @auth_router.post("/refresh", response_model=TokenResponseSchema, status_code=200)
-def refresh_access_token(request: RefreshTokenSchema, db: Session = Depends(get_db)) -> dict:
+async def refresh_access_token(request: RefreshTokenSchema, db: Session = Depends(get_db)) -> dict:
     """
     Update access token using a valid refresh token.
     """
-    token_obj: RefreshToken | None = db.query(RefreshToken).filter(RefreshToken.token == request.refresh_token).first()
-
-    token_obj: RefreshToken = validate_refresh_token(token_obj)
+    #Deactivate old token
+    user_id = await run_in_threadpool(consume_refresh_token, db, request.refresh_token)
+    user = await run_in_threadpool(db.get, User, user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
 
     #Create new token
     access_token = create_access_token(
-        user_id = token_obj.user_id,
-        expires_delta = timedelta(minutes = ACCESS_TOKEN_EXPIRE_MINUTES)
+        user_id = user_id,
+        expires_delta = timedelta(minutes = ACCESS_TOKEN_EXPIRE_MINUTES),
+        role = user.role,
+        token_version = user.token_version
     )
 
-    #Deactivate old token
-    token_obj.active = False
-    db.add(token_obj)
-
     #Create new refresh token
-    refresh_token_data = create_refresh_token(
-        user_id = token_obj.user_id,
+    refresh_token, refresh_token_data = create_refresh_token(
+        user_id = user_id,
         expires_delta = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     )
-    refresh_token = RefreshToken(**refresh_token_data)
-    db.add(refresh_token)
-    db.commit()
+    db.add(RefreshToken(**refresh_token_data))
+    await run_in_threadpool(db.commit)
 
     return {
         'access_token': access_token,
-        'refresh_token': refresh_token.token,
+        'refresh_token': refresh_token,
         'token_type': 'bearer'
-    }
\ No newline at end of file
+    }
+
+
+@auth_router.post("/logout", status_code=204)
+def user_logout(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> None:
+    """
+    Revoke every access and refresh token of the current user.
+    """
+    revoke_user_tokens(db, current_user.user_id)
@@ -0,0 +1,66 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from src.crud import CatalogImporter, iter_catalog_records
+from src.models import UserRole, User
+from src.schemas import ImportResultSchema
+from src.database import get_db, get_read_db
+from src.ndjson import NDJSON_MEDIA_TYPE, aiter_ndjson, gzip_stream, stream_ndjson
+from src.security import get_current_user
+
+catalog_router = APIRouter(tags=["Catalog"])
+
+# Export the Catalog
+@catalog_router.get("/export", response_class=StreamingResponse, status_code=200)
+def export_catalog_endpoint(accept_encoding: str | None = Header(None), db: Session = Depends(get_read_db),
+                            current_user: User = Depends(get_current_user)):
+    """
+    Stream every Tech, Project and link as NDJSON, gzip-compressed when the client accepts it.
+
+    Each line is a record with a `type` of "tech", "project" or "link"; links name their project and tech.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="You are not allowed to export the catalog.")
+    body = stream_ndjson(iter_catalog_records(db))
+    if accept_encoding and "gzip" in accept_encoding.lower():
+        return StreamingResponse(gzip_stream(body), media_type=NDJSON_MEDIA_TYPE,
+                                 headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    return StreamingResponse(body, media_type=NDJSON_MEDIA_TYPE, headers={"Vary": "Accept-Encoding"})
+
+# Import a Catalog
+@catalog_router.post("/import", response_model=ImportResultSchema, status_code=200)
+async def import_catalog_endpoint(request: Request, on_conflict: Literal["skip", "update"] = "skip",
+                                  db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Import an NDJSON catalog as produced by GET /export, optionally sent with `Content-Encoding: gzip`.
+
+    The body is read as a stream and written in batches, each in its own transaction, so batches before
+    an invalid line stay imported. Names are the upsert keys, so importing the same file again is safe.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="You are not allowed to import a catalog.")
+
+    importer = CatalogImporter(db, overwrite=on_conflict == "update")
+    gzip = request.headers.get("content-encoding", "").lower() == "gzip"
+    lines = 0
+    async for line_no, record in aiter_ndjson(request.stream(), gzip=gzip):
+        lines = line_no
+        try:
+            full = importer.add(record)
+        except ValueError as error:  # includes pydantic.ValidationError
+            raise HTTPException(status_code=400, detail=f"Line {line_no}: {_describe(error)}")
+        if full:
+            await run_in_threadpool(importer.flush)
+    await run_in_threadpool(importer.flush)
+    return {"lines": lines, **importer.counts}
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in error.errors())
+    return str(error)
@@ -0,0 +1,32 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from src.crud import iter_changes, read_changes
+from src.schemas import ChangeSchema
+from src.database import get_read_db
+from src.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, stream_json_array
+from src.serialization import list_response
+
+changes_router = APIRouter(prefix="/changes", tags=["Changes"])
+
+# Read catalog changes
+@changes_router.get("", response_model=List[ChangeSchema], status_code=200)
+def read_changes_endpoint(since: int = Query(0, ge=0), limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                          stream: bool = False, db: Session = Depends(get_read_db)):
+    """
+    Get the Tech, Project and link changes made after the `since` version, oldest first.
+
+    Every changed entity appears once with its latest state: upserts carry the current name and description,
+    deleted Techs and Projects come back as `delete` tombstones, and links as `link` or `unlink`.
+    Keep the highest `version` seen and pass it as `since` on the next sync; start from 0 for a full copy.
+    A full page carries the X-Next-Cursor header, and `stream=true` streams every change as a single JSON array.
+    """
+    if stream:
+        return StreamingResponse(stream_json_array(iter_changes(db, since)), media_type="application/json")
+
+    changes = read_changes(db, since, limit)
+    headers = {NEXT_CURSOR_HEADER: str(changes[-1]["version"])} if len(changes) == limit else None
+    return list_response(changes, headers=headers)
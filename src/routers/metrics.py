@@ -0,0 +1,47 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.metrics import registry
+from src.ratelimit import auth_rate_limiter
+from src.security import password_executor
+from src.writes import WRITE_PIPELINE, write_pipeline
+
+metrics_router = APIRouter(tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Prometheus metrics
+@metrics_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint():
+    """
+    Request, password pool, rate limiter and write pipeline metrics in the Prometheus text format.
+    """
+    pool = password_executor.metrics()
+    lines = [
+        "# HELP vaultcore_password_jobs_total bcrypt jobs by outcome.",
+        "# TYPE vaultcore_password_jobs_total counter",
+        f'vaultcore_password_jobs_total{{outcome="completed"}} {pool["completed"]}',
+        f'vaultcore_password_jobs_total{{outcome="rejected"}} {pool["rejected"]}',
+        "# HELP vaultcore_password_queue_seconds_total Time bcrypt jobs spent waiting for a worker.",
+        "# TYPE vaultcore_password_queue_seconds_total counter",
+        f"vaultcore_password_queue_seconds_total {pool['queue_seconds']}",
+        "# HELP vaultcore_password_hash_seconds_total Time spent hashing and checking passwords.",
+        "# TYPE vaultcore_password_hash_seconds_total counter",
+        f"vaultcore_password_hash_seconds_total {pool['hash_seconds']}",
+        "# HELP vaultcore_rate_limited_total Requests rejected by a rate limit, by bucket.",
+        "# TYPE vaultcore_rate_limited_total counter",
+    ]
+    lines.extend(f'vaultcore_rate_limited_total{{bucket="{name}"}} {count}'
+                 for name, count in sorted(auth_rate_limiter.metrics().items()))
+    if WRITE_PIPELINE:
+        writes = write_pipeline.metrics()
+        lines += [
+            "# HELP vaultcore_write_groups_total Group commits made by the write pipeline.",
+            "# TYPE vaultcore_write_groups_total counter",
+            f"vaultcore_write_groups_total {writes['groups']}",
+            "# HELP vaultcore_write_jobs_total Writes handled by the write pipeline, by outcome.",
+            "# TYPE vaultcore_write_jobs_total counter",
+            f'vaultcore_write_jobs_total{{outcome="handled"}} {writes["writes"]}',
+            f'vaultcore_write_jobs_total{{outcome="rejected"}} {writes["rejected"]}',
+        ]
+    return PlainTextResponse(registry.render() + "\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
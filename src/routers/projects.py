@@ -1,14 +1,21 @@
-from typing import List
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from src.models import User, UserRole
-from src.crud import (create_project, read_project, read_all_project, update_project, delete_project,
+from src.crud import (BULK_MAX_ITEMS, PROJECT_FIELDS, create_project, bulk_upsert_projects, read_project_payload,
+                      read_project_rows, iter_project_rows, project_tech_facets, update_project, delete_project,
                       link_techs_to_project)
-from src.schemas import ProjectCreateSchema, ProjectReadSchema, ProjectUpdateSchema
-from src.database import get_db
+from src.schemas import (BulkItemResultSchema, ProjectCreateSchema, ProjectReadSchema, ProjectUpdateSchema,
+                         ProjectTechLinkResultSchema, TechFacetSchema)
+from src.cache import etag_matches
+from src.database import get_db, get_read_db
+from src.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, stream_json_array
 from src.security import get_current_user
+from src.serialization import list_response, parse_fields
+from src.writes import run_write
 
 project_router = APIRouter(prefix="/projects", tags=["Projects"])
 
@@ -21,27 +28,81 @@ def create_project_endpoint(data: ProjectCreateSchema, db: Session = Depends(get
     """
     if not current_user.role in [UserRole.ADMIN, UserRole.EDITOR]:
         raise HTTPException(status_code=403, detail="You are not allowed to create projects.")
-    project = create_project(db, data)
+    project = run_write(db, create_project, data)
     return project
 
+# Bulk create Projects
+@project_router.post("/bulk", response_model=List[BulkItemResultSchema], status_code=200)
+def bulk_create_projects_endpoint(data: List[ProjectCreateSchema], on_conflict: Literal["skip", "update"] = "skip",
+                                  db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Create many Project objects in one transaction.
+
+    Existing names are reported as conflicts, or have their description updated with `on_conflict=update`.
+    """
+    if not current_user.role in [UserRole.ADMIN, UserRole.EDITOR]:
+        raise HTTPException(status_code=403, detail="You are not allowed to create projects.")
+    if len(data) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request.")
+    return bulk_upsert_projects(db, data, overwrite=on_conflict == "update")
+
+# Tech facets for a Project filter
+@project_router.get("/facets", response_model=List[TechFacetSchema], status_code=200)
+def project_tech_facets_endpoint(tech: List[int] = Query(default=[]), match: Literal["all", "any"] = "all",
+                                 db: Session = Depends(get_read_db)):
+    """
+    Count the projects using each Tech, among the projects matching the `tech`/`match` filter.
+    """
+    return list_response(project_tech_facets(db, tech, match), TechFacetSchema)
+
 # Read single Project
 @project_router.get("/{project_id}", response_model=ProjectReadSchema, status_code=200)
-def read_project_endpoint(project_id: int, db: Session = Depends(get_db)):
+def read_project_endpoint(project_id: int, fields: str | None = None, include: Literal["techs"] | None = None,
+                          if_none_match: str | None = Header(None), db: Session = Depends(get_read_db)):
     """
     Get a Project by ID.
+
+    Responses carry an ETag; a matching If-None-Match header gets a 304 without a body.
+    `fields` and `include` work as on GET /projects/.
     """
-    project = read_project(db, project_id)
-    if not project:
+    selected = parse_fields(fields, PROJECT_FIELDS) if fields is not None else None
+    entry = read_project_payload(db, project_id, selected, include_techs=include == "techs")
+    if not entry:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
+    body, etag = entry
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 # Read all Projects
 @project_router.get("/", response_model=List[ProjectReadSchema])
-def read_all_project_endpoint(db: Session = Depends(get_db)):
+def read_all_project_endpoint(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                              after: int | None = Query(None, ge=0),
+                              tech: List[int] = Query(default=[]),
+                              match: Literal["all", "any"] = "all",
+                              fields: str | None = None,
+                              include: Literal["techs"] | None = None,
+                              stream: bool = False,
+                              db: Session = Depends(get_read_db)):
     """
-    Get all Project objects.
+    Get Project objects ordered by ID, one page at a time.
+
+    Pass the X-Next-Cursor header value as `after` to fetch the next page.
+    Repeat `tech` to keep only projects using all of those Techs, or any of them with `match=any`.
+    With `stream=true` every Project after the cursor is streamed as a single JSON array.
+
+    `fields` is a comma-separated list of the fields to return (project_id is always included). Once `fields`
+    is given, techs are only embedded with `include=techs`.
     """
-    return read_all_project(db)
+    selected = parse_fields(fields, PROJECT_FIELDS)
+    include_techs = fields is None or include == "techs"
+    if stream:
+        chunks = iter_project_rows(db, selected, include_techs, after=after, tech_ids=tech, match=match)
+        return StreamingResponse(stream_json_array(chunks), media_type="application/json")
+
+    projects = read_project_rows(db, selected, include_techs, limit=limit, after=after, tech_ids=tech, match=match)
+    headers = {NEXT_CURSOR_HEADER: str(projects[-1]["project_id"])} if len(projects) == limit else None
+    return list_response(projects, headers=headers)
 
 # Update Project
 @project_router.patch("/{project_id}", response_model=ProjectReadSchema, status_code=200)
@@ -52,7 +113,7 @@ def update_project_endpoint(project_id: int, data: ProjectUpdateSchema, db: Sess
     """
     if not current_user.role in [UserRole.ADMIN, UserRole.EDITOR]:
         raise HTTPException(status_code=403, detail="You are not allowed to update projects.")
-    project = update_project(db, project_id, data)
+    project = run_write(db, update_project, project_id, data)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
@@ -66,15 +127,22 @@ def delete_project_endpoint(project_id: int, db: Session = Depends(get_db),
     """
     if not current_user.role in [UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="You are not allowed to delete projects.")
-    delete_project(db, project_id)
+    run_write(db, delete_project, project_id)
 
 # Link Techs to Project
-@project_router.put("/{project_id}/techs", response_model=ProjectReadSchema, status_code=200)
-def link_techs_to_project_endpoint(project_id: int, tech_ids: List[int], db: Session = Depends(get_db),
-                                   current_user: User = Depends(get_current_user)):
+@project_router.put("/{project_id}/techs", response_model=ProjectTechLinkResultSchema, status_code=200)
+def link_techs_to_project_endpoint(project_id: int, tech_ids: List[int],
+                                   mode: Literal["add", "remove", "replace"] = "add",
+                                   db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Add, remove or replace the Techs linked to a Project.
+
+    IDs that don't match any Tech are reported in `unknown_tech_ids`.
+    """
     if not current_user.role in [UserRole.ADMIN, UserRole.EDITOR]:
         raise HTTPException(status_code=403, detail="You are not allowed to update projects.")
-    project = link_techs_to_project(db, project_id, tech_ids)
-    if not project:
+    result = run_write(db, link_techs_to_project, project_id, tech_ids, mode)
+    if not result:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
\ No newline at end of file
+    project = ProjectReadSchema.model_validate(result.pop("project"))
+    return ProjectTechLinkResultSchema(**project.model_dump(), **result)
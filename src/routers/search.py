@@ -0,0 +1,20 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from src.crud import search_catalog
+from src.schemas import SearchResultSchema
+from src.database import get_read_db
+from src.serialization import list_response
+
+search_router = APIRouter(prefix="/search", tags=["Search"])
+
+# Search Techs and Projects
+@search_router.get("", response_model=List[SearchResultSchema], status_code=200)
+def search_endpoint(q: str = Query(..., min_length=1, max_length=200), limit: int = Query(20, ge=1, le=100),
+                    db: Session = Depends(get_read_db)):
+    """
+    Full-text search across Tech and Project names and descriptions, ranked by relevance.
+    """
+    return list_response(search_catalog(db, q, limit), SearchResultSchema)
@@ -1,13 +1,20 @@
-from typing import List
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from src.crud import create_tech, read_tech, read_all_tech, update_tech, delete_tech
+from src.crud import (BULK_MAX_ITEMS, PROJECT_FIELDS, TECH_FIELDS, create_tech, bulk_upsert_techs, read_tech_payload,
+                      read_tech_rows, iter_tech_rows, read_tech_projects, read_popular_techs, update_tech, delete_tech)
 from src.models import UserRole, User
-from src.schemas import TechCreateSchema, TechReadSchema, TechUpdateSchema
-from src.database import get_db
+from src.schemas import (BulkItemResultSchema, ProjectReadSchema, TechCreateSchema, TechReadSchema, TechUpdateSchema,
+                         TechUsageSchema)
+from src.cache import etag_matches
+from src.database import get_db, get_read_db
+from src.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, stream_json_array
 from src.security import get_current_user
+from src.serialization import list_response, parse_fields
+from src.writes import run_write
 
 techs_router = APIRouter(prefix="/techs", tags=["Techs"])
 
@@ -20,27 +27,93 @@ def create_tech_endpoint(data: TechCreateSchema, db: Session = Depends(get_db),
     """
     if not current_user.role in [UserRole.ADMIN, UserRole.EDITOR]:
         raise HTTPException(status_code=403, detail="You are not allowed to create techs.")
-    tech = create_tech(db, data)
+    tech = run_write(db, create_tech, data)
     return tech
 
+# Bulk create Techs
+@techs_router.post("/bulk", response_model=List[BulkItemResultSchema], status_code=200)
+def bulk_create_techs_endpoint(data: List[TechCreateSchema], on_conflict: Literal["skip", "update"] = "skip",
+                               db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """
+    Create many Tech objects in one transaction.
+
+    Existing names are reported as conflicts, or have their description updated with `on_conflict=update`.
+    """
+    if not current_user.role in [UserRole.ADMIN, UserRole.EDITOR]:
+        raise HTTPException(status_code=403, detail="You are not allowed to create techs.")
+    if len(data) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request.")
+    return bulk_upsert_techs(db, data, overwrite=on_conflict == "update")
+
+# Read most used Techs (declared before /{tech_id} so "popular" isn't taken for an ID)
+@techs_router.get("/popular", response_model=List[TechUsageSchema], status_code=200)
+def read_popular_techs_endpoint(limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE), db: Session = Depends(get_read_db)):
+    """
+    Get the Techs used by the most projects, with their project counts, most used first.
+    """
+    return list_response(read_popular_techs(db, limit))
+
 # Read single Tech
 @techs_router.get("/{tech_id}", response_model=TechReadSchema, status_code=200)
-def read_tech_endpoint(tech_id: int, db: Session = Depends(get_db)):
+def read_tech_endpoint(tech_id: int, fields: str | None = None, if_none_match: str | None = Header(None),
+                       db: Session = Depends(get_read_db)):
     """
     Get a Tech object by ID.
+
+    Responses carry an ETag; a matching If-None-Match header gets a 304 without a body.
+    `fields` is a comma-separated list of the fields to return (tech_id is always included).
     """
-    tech = read_tech(db, tech_id)
-    if not tech:
+    entry = read_tech_payload(db, tech_id, parse_fields(fields, TECH_FIELDS) if fields is not None else None)
+    if not entry:
         raise HTTPException(status_code=404, detail="Tech not found")
-    return tech
+    body, etag = entry
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 # Read all Techs
 @techs_router.get("/", response_model=List[TechReadSchema])
-def read_all_techs_endpoint(db: Session = Depends(get_db)):
+def read_all_techs_endpoint(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                            after: int | None = Query(None, ge=0),
+                            fields: str | None = None,
+                            stream: bool = False,
+                            db: Session = Depends(get_read_db)):
     """
-    Get all Tech objects.
+    Get Tech objects ordered by ID, one page at a time.
+
+    Pass the X-Next-Cursor header value as `after` to fetch the next page.
+    With `stream=true` every Tech after the cursor is streamed as a single JSON array.
+    `fields` is a comma-separated list of the fields to return (tech_id is always included).
     """
-    return read_all_tech(db)
+    selected = parse_fields(fields, TECH_FIELDS)
+    if stream:
+        return StreamingResponse(stream_json_array(iter_tech_rows(db, selected, after=after)),
+                                 media_type="application/json")
+
+    techs = read_tech_rows(db, selected, limit=limit, after=after)
+    headers = {NEXT_CURSOR_HEADER: str(techs[-1]["tech_id"])} if len(techs) == limit else None
+    return list_response(techs, headers=headers)
+
+# Read Projects using a Tech
+@techs_router.get("/{tech_id}/projects", response_model=List[ProjectReadSchema], status_code=200)
+def read_tech_projects_endpoint(tech_id: int,
+                                limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                                after: int | None = Query(None, ge=0),
+                                fields: str | None = None,
+                                include: Literal["techs"] | None = None,
+                                db: Session = Depends(get_read_db)):
+    """
+    Get the Projects using a Tech, ordered by ID, one page at a time.
+
+    `fields` and `include` work as on GET /projects/.
+    """
+    include_techs = fields is None or include == "techs"
+    projects = read_tech_projects(db, tech_id, parse_fields(fields, PROJECT_FIELDS), include_techs, limit=limit,
+                                  after=after)
+    if projects is None:
+        raise HTTPException(status_code=404, detail="Tech not found")
+    headers = {NEXT_CURSOR_HEADER: str(projects[-1]["project_id"])} if len(projects) == limit else None
+    return list_response(projects, headers=headers)
 
 # Update Tech
 @techs_router.patch("/{tech_id}", response_model=TechReadSchema, status_code=200)
@@ -51,7 +124,7 @@ def update_tech_endpoint(tech_id: int, data: TechUpdateSchema, db: Session = Dep
     """
     if not current_user.role in [UserRole.ADMIN, UserRole.EDITOR]:
         raise HTTPException(status_code=403, detail="You are not allowed to update techs.")
-    tech = update_tech(db, tech_id, data)
+    tech = run_write(db, update_tech, tech_id, data)
     if not tech:
         raise HTTPException(status_code=404, detail="Tech not found")
     return tech
@@ -64,4 +137,4 @@ def delete_tech_endpoint(tech_id: int, db: Session = Depends(get_db), current_us
     """
     if not current_user.role in [UserRole.ADMIN]:
         raise HTTPException(status_code=403, detail="You are not allowed to delete techs.")
-    delete_tech(db, tech_id)
\ No newline at end of file
+    run_write(db, delete_tech, tech_id)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Annotated, List
+from typing import Annotated, List, Literal
 
 from pydantic import BaseModel, StringConstraints, field_validator, EmailStr, Field
 from pydantic.config import ConfigDict
@@ -56,10 +56,77 @@ class ProjectReadSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TechFacetSchema(BaseModel):
+    tech_id: int
+    name: str
+    count: int
+
+
+class TechUsageSchema(BaseModel):
+    tech_id: int
+    name: str
+    project_count: int
+
+
 class ProjectTechLinkSchema(BaseModel):
     tech_ids: List[int]
 
 
+class ProjectTechLinkResultSchema(ProjectReadSchema):
+    added_tech_ids: List[int] = Field(default_factory=list)
+    removed_tech_ids: List[int] = Field(default_factory=list)
+    unknown_tech_ids: List[int] = Field(default_factory=list)
+
+
+# Bulk operations
+class BulkItemResultSchema(BaseModel):
+    index: int
+    name: str
+    status: Literal["created", "updated", "conflict"]
+    id: int | None = None
+    detail: str | None = None
+
+
+# Search
+class SearchResultSchema(BaseModel):
+    type: Literal["tech", "project"]
+    id: int
+    name: str
+    description: str | None = None
+    score: float
+
+
+# Catalog import
+class ImportCountsSchema(BaseModel):
+    created: int = 0
+    updated: int = 0
+    conflict: int = 0
+
+
+class ImportLinkCountsSchema(BaseModel):
+    created: int = 0
+    existing: int = 0
+    unknown: int = 0
+
+
+class ImportResultSchema(BaseModel):
+    lines: int
+    techs: ImportCountsSchema
+    projects: ImportCountsSchema
+    links: ImportLinkCountsSchema
+
+
+# Delta sync
+class ChangeSchema(BaseModel):
+    version: int
+    type: Literal["tech", "project", "link"]
+    op: Literal["upsert", "delete", "link", "unlink"]
+    id: int  # tech_id or project_id; the project_id for links
+    tech_id: int | None = None  # links only
+    name: str | None = None  # upserts only
+    description: str | None = None
+
+
 # User model
 class UserRegisterSchema(BaseSchema):
     username: str
@@ -1,4 +1,6 @@
-import os, uuid
+import asyncio, hashlib, os, secrets, threading, time, uuid
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 from dotenv import load_dotenv
@@ -6,94 +8,376 @@ import bcrypt
 import jwt
 
 from fastapi import Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import Session, get_db
-from src.models import RefreshToken, User
+from src.database import Session, get_async_db, get_db
+from src.metrics import record_bcrypt_time, record_jwt_time
+from src.models import RefreshToken, User, UserRole
 
 
 bearer_scheme = HTTPBearer()
 
 # ENV
 load_dotenv()
-TOKEN_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
-if not TOKEN_SECRET_KEY:
-    raise RuntimeError("JWT_SECRET_KEY not set")
 TOKEN_ALGORITHM = "HS256"
-FAKE_PASSWORD_HASH = "$2b$12$C6UzMDM.H6dfI/f/IKcEeO8M0Y2F9v4K4D1R5Jt3fY6G6Z0p6E9eW"  # for timing-hardening
+# bcrypt cost: BCRYPT_ROUNDS fixes it, BCRYPT_TARGET_MS calibrates it to a per-hash latency on this machine.
+# Each worker calibrates on its own, so pin the result with `python cli.py calibrate-bcrypt-rounds <ms>`.
+BCRYPT_ROUNDS = os.getenv("BCRYPT_ROUNDS")
+BCRYPT_TARGET_MS = os.getenv("BCRYPT_TARGET_MS")
+DEFAULT_BCRYPT_ROUNDS = 12
+# Embed role and token version in access tokens so that get_current_user can skip the users table
+JWT_EMBED_CLAIMS = os.getenv("JWT_EMBED_CLAIMS", "false").lower() in ("1", "true", "yes")
+TOKEN_VERSION_REFRESH_SECONDS = float(os.getenv("TOKEN_VERSION_REFRESH_SECONDS", "5"))
+# bcrypt runs on a dedicated pool ("thread" or "process") with a cap on running + queued jobs
+PASSWORD_EXECUTOR = os.getenv("PASSWORD_EXECUTOR", "thread")
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", str(PASSWORD_WORKERS * 4)))
 
 
 # Password handling
+def _bcrypt_hashpw(password: bytes, salt: bytes) -> tuple[bytes, float]:
+    started = time.time()
+    return bcrypt.hashpw(password, salt), started
+
+def _bcrypt_checkpw(password: bytes, hashed_password: bytes) -> tuple[bool, float]:
+    started = time.time()
+    return bcrypt.checkpw(password, hashed_password), started
+
+
+class PasswordExecutor:
+    """
+    Size-bounded pool for bcrypt work.
+
+    At most `max_pending` hashes may be running or queued at once; anything beyond that is rejected
+    with a 503 straight away, so a login burst can't tie up the request threads that serve everything else.
+    """
+
+    def __init__(self, kind: str = PASSWORD_EXECUTOR, workers: int = PASSWORD_WORKERS,
+                 max_pending: int = PASSWORD_MAX_PENDING):
+        if kind not in ("thread", "process"):
+            raise RuntimeError(f"PASSWORD_EXECUTOR must be 'thread' or 'process', got {kind!r}")
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool: Executor | None = None
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._rejected = 0
+        self._queue_seconds = 0.0
+        self._hash_seconds = 0.0
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+                else:
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="bcrypt")
+            return self._pool
+
+    def _acquire(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HTTPException(status_code=503, detail="Server is busy, try again shortly.",
+                                headers={"Retry-After": "1"})
+
+    def _record(self, submitted: float, started: float, finished: float) -> None:
+        with self._lock:
+            self._completed += 1
+            self._queue_seconds += max(started - submitted, 0.0)
+            self._hash_seconds += finished - started
+        record_bcrypt_time(finished - submitted)
+
+    def run(self, fn, *args):
+        """
+        Run a bcrypt job on the pool and wait for its result, blocking the calling thread.
+        """
+        self._acquire()
+        try:
+            submitted = time.time()
+            result, started = self._get_pool().submit(fn, *args).result()
+            finished = time.time()
+        finally:
+            self._slots.release()
+        self._record(submitted, started, finished)
+        return result
+
+    async def run_async(self, fn, *args):
+        """
+        Run a bcrypt job on the pool and await its result, without holding a request thread meanwhile.
+        """
+        self._acquire()
+        try:
+            submitted = time.time()
+            result, started = await asyncio.get_running_loop().run_in_executor(self._get_pool(), fn, *args)
+            finished = time.time()
+        finally:
+            self._slots.release()
+        self._record(submitted, started, finished)
+        return result
+
+    def metrics(self) -> dict:
+        """
+        Snapshot of the pool counters: completed and rejected jobs, total time queued and total time hashing.
+        """
+        with self._lock:
+            return {
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "queue_seconds": self._queue_seconds,
+                "hash_seconds": self._hash_seconds,
+            }
+
+
+password_executor = PasswordExecutor()
+
+def calibrate_bcrypt_rounds(target_ms: float) -> int:
+    """
+    Find the lowest bcrypt cost whose hash takes at least target_ms on this machine.
+
+    Each extra round doubles the work, so a single measurement at cost 8 is enough to extrapolate.
+    """
+    rounds = 8
+    started = time.perf_counter()
+    bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    while rounds > 4 and elapsed_ms / 2 >= target_ms:
+        rounds -= 1
+        elapsed_ms /= 2
+    while rounds < 31 and elapsed_ms < target_ms:
+        rounds += 1
+        elapsed_ms *= 2
+    return rounds
+
+_bcrypt_rounds: int | None = None
+_fake_password_hash: str | None = None
+
+def get_bcrypt_rounds() -> int:
+    """
+    Get the bcrypt cost for new hashes, calibrating it on first use if BCRYPT_TARGET_MS is set.
+    """
+    global _bcrypt_rounds
+    if _bcrypt_rounds is None:
+        if BCRYPT_ROUNDS:
+            _bcrypt_rounds = int(BCRYPT_ROUNDS)
+        elif BCRYPT_TARGET_MS:
+            _bcrypt_rounds = calibrate_bcrypt_rounds(float(BCRYPT_TARGET_MS))
+        else:
+            _bcrypt_rounds = DEFAULT_BCRYPT_ROUNDS
+    return _bcrypt_rounds
+
+def get_fake_password_hash() -> str:
+    """
+    Dummy hash at the configured cost, checked for unknown users so they take as long as real ones.
+    """
+    global _fake_password_hash
+    if _fake_password_hash is None:
+        _fake_password_hash = bcrypt.hashpw(uuid.uuid4().bytes, bcrypt.gensalt(get_bcrypt_rounds())).decode()
+    return _fake_password_hash
+
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a stored hash was made with a lower cost than the configured one.
+
+    Higher costs are kept, so workers that calibrated a round apart don't re-hash each other's users.
+    """
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds < get_bcrypt_rounds()
+
 def hash_password(password: str) -> str:
     """
     Hash a password.
     """
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password.encode(), salt)
+    salt = bcrypt.gensalt(get_bcrypt_rounds())
+    hashed_password = password_executor.run(_bcrypt_hashpw, password.encode(), salt)
     return hashed_password.decode()
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(password.encode(), hashed_password.encode())
+    return password_executor.run(_bcrypt_checkpw, password.encode(), hashed_password.encode())
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password from an async route.
+    """
+    salt = bcrypt.gensalt(get_bcrypt_rounds())
+    hashed_password = await password_executor.run_async(_bcrypt_hashpw, password.encode(), salt)
+    return hashed_password.decode()
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    return await password_executor.run_async(_bcrypt_checkpw, password.encode(), hashed_password.encode())
 
 # User authentication
-def user_authentication(user_data, db: Session) -> User:
+async def user_authentication(user_data, db: Session) -> User:
     """
     User Authentication with password timing-hardening  protection.
+
+    Hashes made with an outdated cost are transparently replaced after a successful login.
+    Only the queries take a request thread; bcrypt is awaited on the password pool.
     """
-    user: User | None = db.query(User).filter(User.username == user_data.username).first()
+    user: User | None = await run_in_threadpool(
+        lambda: db.query(User).filter(User.username == user_data.username).first()
+    )
 
     # Timing-hardening
     user_password = (
         user.password_hash
         if user
-        else FAKE_PASSWORD_HASH
+        else get_fake_password_hash()
     )
 
     # Authentication
-    if not verify_password(user_data.password, user_password):
+    if not await verify_password_async(user_data.password, user_password):
         raise HTTPException(status_code=401, detail="Incorrect username or password")
 
+    # Rehash with the current cost; if the password pool is saturated, try again on the next login
+    if needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await hash_password_async(user_data.password)
+            await run_in_threadpool(db.commit)
+        except HTTPException:
+            pass
+
     return user
 
 # Token handling
-def create_access_token(user_id: int, expires_delta: timedelta = timedelta(minutes=30)) -> str:
+_token_secret_key: str | None = None
+
+def get_token_secret_key() -> str:
+    """
+    Get the JWT signing key, read from JWT_SECRET_KEY on first use.
+    """
+    global _token_secret_key
+    if _token_secret_key is None:
+        secret = os.getenv("JWT_SECRET_KEY")
+        if not secret:
+            raise RuntimeError("JWT_SECRET_KEY not set")
+        _token_secret_key = secret
+    return _token_secret_key
+
+class TokenVersionTable:
     """
-    Create JWT access token with user_id and expiration date.
+    In-memory copy of users.token_version, refreshed from the database every few seconds.
+
+    Only users whose tokens were revoked at least once (token_version > 0) are kept, so the table stays small.
+    """
+
+    def __init__(self, refresh_interval: float = TOKEN_VERSION_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self._versions: dict[int, int] = {}
+        self._loaded_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def current(self, user_id: int) -> int:
+        """
+        Get the lowest token version still accepted for a user.
+        """
+        if self._stale():
+            self.refresh()
+        return self._versions.get(user_id, 0)
+
+    async def current_async(self, user_id: int, db: AsyncSession) -> int:
+        """
+        Same as current, reloading the table through an async session.
+        """
+        if self._stale() and self._lock.acquire(blocking=False):
+            try:
+                rows = await db.execute(select(User.user_id, User.token_version).where(User.token_version > 0))
+                self._versions = dict(rows.tuples().all())
+                self._loaded_at = time.monotonic()
+            finally:
+                self._lock.release()
+        return self._versions.get(user_id, 0)
+
+    def _stale(self) -> bool:
+        return time.monotonic() - self._loaded_at > self.refresh_interval
+
+    def refresh(self) -> None:
+        # Only one thread reloads; the others keep using the previous table meanwhile
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            db = Session()
+            try:
+                rows = db.execute(select(User.user_id, User.token_version).where(User.token_version > 0))
+                self._versions = dict(rows.tuples().all())
+            finally:
+                db.close()
+            self._loaded_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def bump(self, user_id: int, version: int) -> None:
+        self._versions[user_id] = max(version, self._versions.get(user_id, 0))
+
+
+token_versions = TokenVersionTable()
+
+def create_access_token(user_id: int, expires_delta: timedelta = timedelta(minutes=30),
+                        role: UserRole | None = None, token_version: int = 0) -> str:
+    """
+    Create JWT access token with user_id, token version and expiration date.
+
+    With JWT_EMBED_CLAIMS enabled the user's role is embedded as well.
     """
     payload = {
         "sub": str(user_id),
-        "exp": datetime.now(timezone.utc) + expires_delta
+        "exp": datetime.now(timezone.utc) + expires_delta,
+        "ver": token_version  # checked against users.token_version, so tokens issued before a revoke stop working
     }
+    if JWT_EMBED_CLAIMS and role is not None:
+        payload["role"] = role.value
 
-    token = jwt.encode(payload, TOKEN_SECRET_KEY, algorithm=TOKEN_ALGORITHM)
+    started = time.perf_counter()
+    token = jwt.encode(payload, get_token_secret_key(), algorithm=TOKEN_ALGORITHM)
+    record_jwt_time(time.perf_counter() - started)
     return token
 
-def create_refresh_token(user_id: int, expires_delta: timedelta = timedelta(days=3)) -> dict:
+def hash_refresh_token(token: str) -> bytes:
+    """
+    Digest under which a refresh token is stored and looked up.
+    """
+    return hashlib.sha256(token.encode()).digest()
+
+def create_refresh_token(user_id: int, expires_delta: timedelta = timedelta(days=3)) -> tuple[str, dict]:
     """
     Generate a new refresh token entry for a user.
+
+    Returns the token to hand out and the row data, which only keeps the token's digest.
     """
     now = datetime.now(timezone.utc)
+    token = secrets.token_urlsafe(32)
     refresh_token = {
-        "user_id": str(user_id),
-        "token": str(uuid.uuid4()),
+        "user_id": user_id,
+        "token": hash_refresh_token(token),
         "created_at": now,
         "expires_at": now + expires_delta,
         "active": True
     }
 
-    return refresh_token
+    return token, refresh_token
 
-def validate_jwt_token(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> dict:
+def decode_jwt_token(token: str) -> dict:
     """
-       Validate a JWT access token and return its payload.
+    Validate a JWT access token and return its payload.
     """
-    token = credentials.credentials
+    started = time.perf_counter()
     try:
-        payload = jwt.decode(token, TOKEN_SECRET_KEY, algorithms=[TOKEN_ALGORITHM])
+        payload = jwt.decode(token, get_token_secret_key(), algorithms=[TOKEN_ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Expired token")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    finally:
+        record_jwt_time(time.perf_counter() - started)
 
     sub = payload.get("sub")
     if not sub:
@@ -101,16 +385,71 @@ def validate_jwt_token(credentials: HTTPAuthorizationCredentials = Depends(beare
 
     return payload
 
+def validate_jwt_token(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> dict:
+    """
+       Validate a JWT access token and return its payload.
+    """
+    return decode_jwt_token(credentials.credentials)
+
 def get_current_user(db: Session = Depends(get_db), payload: dict = Depends(validate_jwt_token)) -> User:
     """
     Retrieve the current user from the database using the JWT payload.
+
+    Tokens carrying embedded claims are checked against the in-memory token version table instead,
+    and resolve to a detached User holding only user_id and role.
     """
     user_id = int(payload['sub'])
+    if JWT_EMBED_CLAIMS and "role" in payload and "ver" in payload:
+        if payload["ver"] < token_versions.current(user_id):
+            raise HTTPException(status_code=401, detail="Token revoked")
+        return User(user_id=user_id, role=UserRole(payload["role"]))
+
     user = db.query(User).filter(User.user_id == user_id).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    if payload.get("ver", 0) < user.token_version:
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return user
+
+async def get_current_user_async(db: AsyncSession = Depends(get_async_db),
+                                 credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> User:
+    """
+    get_current_user for the async routes: same checks, run on their AsyncSession instead of a request thread.
+    """
+    payload = decode_jwt_token(credentials.credentials)
+    user_id = int(payload['sub'])
+    if JWT_EMBED_CLAIMS and "role" in payload and "ver" in payload:
+        if payload["ver"] < await token_versions.current_async(user_id, db):
+            raise HTTPException(status_code=401, detail="Token revoked")
+        return User(user_id=user_id, role=UserRole(payload["role"]))
+
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    if payload.get("ver", 0) < user.token_version:
+        raise HTTPException(status_code=401, detail="Token revoked")
     return user
 
+def revoke_user_tokens(db: Session, user_id: int) -> None:
+    """
+    Invalidate every access and refresh token issued to a user so far.
+
+    Call this on logout and whenever a user's role changes.
+    """
+    version = db.execute(
+        update(User)
+        .where(User.user_id == user_id)
+        .values(token_version=User.token_version + 1)
+        .returning(User.token_version)
+    ).scalar_one()
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.active.is_(True))
+        .values(active=False)
+    )
+    db.commit()
+    token_versions.bump(user_id, version)
+
 def validate_refresh_token(token_obj: RefreshToken) -> RefreshToken:
     """
     Validate refresh token and return itself
@@ -119,9 +458,30 @@ def validate_refresh_token(token_obj: RefreshToken) -> RefreshToken:
         raise HTTPException(status_code=401, detail="Token not found")
     if not token_obj.active:
         raise HTTPException(status_code=401, detail="Token revoked")
-    if token_obj.expires_at < datetime.now(timezone.utc):
+    if token_obj.expires_at.replace(tzinfo=timezone.utc) < datetime.now(timezone.utc):  # SQLite drops tzinfo
         raise HTTPException(status_code=401, detail="Token has expired")
 
     return token_obj
 
+def consume_refresh_token(db: Session, token: str) -> int:
+    """
+    Deactivate a valid refresh token and return its user_id.
 
+    The check and the deactivation are a single conditional UPDATE, so a token can only be used once.
+    """
+    digest = hash_refresh_token(token)
+    user_id = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token == digest,
+               RefreshToken.active.is_(True),
+               RefreshToken.expires_at > datetime.now(timezone.utc))
+        .values(active=False)
+        .returning(RefreshToken.user_id)
+    ).scalar_one_or_none()
+
+    if user_id is None:
+        # Slow path only: find out why the token was rejected
+        db.rollback()
+        validate_refresh_token(db.query(RefreshToken).filter(RefreshToken.token == digest).first())
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return user_id
@@ -0,0 +1,128 @@
+import json
+from functools import lru_cache
+from typing import Any, Callable, List, Sequence, Type, get_args, get_origin
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional: without it every schema goes through its pydantic adapter
+    orjson = None
+
+# Fast JSON encoding for read schemas filled from trusted data (ORM rows and our own query results).
+# FastAPI would validate every object against response_model and then encode it with the stdlib json module;
+# here plain read schemas are flattened straight to dicts and encoded by orjson in one call.
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """
+    Cached TypeAdapter validating and serializing a list of `schema` in a single pass.
+    """
+    return TypeAdapter(List[schema])
+
+
+def _is_plain(schema: Type[BaseModel]) -> bool:
+    # Anything that changes values on the way in or out needs the real pydantic schema
+    decorators = schema.__pydantic_decorators__
+    return not (decorators.validators or decorators.field_validators or decorators.root_validators
+                or decorators.model_validators or decorators.field_serializers or decorators.model_serializers
+                or decorators.computed_fields
+                or any(field.alias or field.serialization_alias for field in schema.model_fields.values()))
+
+
+def _nested_schema(annotation: Any) -> tuple[Type[BaseModel] | None, bool]:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    if get_origin(annotation) in (list, List):
+        (item,) = get_args(annotation) or (None,)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return item, True
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def plain_encoder(schema: Type[BaseModel]) -> Callable[[Any], dict] | None:
+    """
+    Cached function flattening an object (or a dict) into a JSON-ready dict shaped like `schema`.
+
+    Returns None for schemas with validators, serializers or aliases, which must go through pydantic.
+    """
+    if orjson is None or not _is_plain(schema):
+        return None
+
+    fields = []
+    for name, field in schema.model_fields.items():
+        nested, many = _nested_schema(field.annotation)
+        if nested is not None:
+            nested_encoder = plain_encoder(nested)
+            if nested_encoder is None:
+                return None
+        else:
+            nested_encoder = None
+        fields.append((name, nested_encoder, many))
+
+    def encode(obj) -> dict:
+        get = obj.get if isinstance(obj, dict) else obj.__getattribute__
+        data = {}
+        for name, nested_encoder, many in fields:
+            value = get(name)
+            if nested_encoder is not None and value is not None:
+                value = [nested_encoder(item) for item in value] if many else nested_encoder(value)
+            data[name] = value
+        return data
+
+    return encode
+
+
+def dump_plain(value) -> bytes:
+    """
+    Encode data that is already JSON-shaped, such as the row dicts from the crud *_rows functions.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def load_plain(data: bytes):
+    """
+    Decode a JSON document, with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_list(objs: List, schema: Type[BaseModel] | None = None) -> bytes:
+    """
+    Serialize objects as a JSON array shaped like `schema`, or as they are when no schema is given.
+    """
+    if schema is None:
+        return dump_plain(objs)
+    encoder = plain_encoder(schema)
+    if encoder is not None:
+        return orjson.dumps([encoder(obj) for obj in objs])
+    adapter = list_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(objs, from_attributes=True))
+
+
+def list_response(objs: List, schema: Type[BaseModel] | None = None, headers: dict | None = None) -> Response:
+    """
+    JSON response for a list endpoint, bypassing FastAPI's response_model validation and encoding.
+    """
+    return Response(content=dump_list(objs, schema), media_type="application/json", headers=headers)
+
+
+def parse_fields(fields: str | None, allowed: Sequence[str]) -> tuple[str, ...]:
+    """
+    Parse a comma-separated ?fields= value into the allowed fields it names, in their usual order.
+    """
+    if fields is None:
+        return tuple(allowed)
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}. "
+                                                    f"Available fields: {', '.join(allowed)}.")
+    return tuple(field for field in allowed if field in requested)
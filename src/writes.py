@@ -0,0 +1,187 @@
+import contextvars
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.cache import deferred_invalidation
+from src.database import get_engine
+
+# ENV
+load_dotenv()
+# Apply catalog writes on a single writer thread, committing the writes of concurrent requests together
+WRITE_PIPELINE = os.getenv("WRITE_PIPELINE", "false").lower() in ("1", "true", "yes")
+# How long the writer waits for more writes after the first one of a group, and how many it takes at most
+WRITE_PIPELINE_WINDOW_MS = float(os.getenv("WRITE_PIPELINE_WINDOW_MS", "1"))
+WRITE_PIPELINE_MAX_BATCH = int(os.getenv("WRITE_PIPELINE_MAX_BATCH", "64"))
+# Writes waiting beyond this are rejected with a 503 instead of queueing without bound
+WRITE_PIPELINE_MAX_PENDING = int(os.getenv("WRITE_PIPELINE_MAX_PENDING", "1000"))
+
+
+class GroupSession(Session):
+    """
+    Session handed to writers running in a group: their commit() and rollback() only end their own savepoint.
+
+    The pipeline commits the whole group afterwards, so crud functions run unchanged.
+    """
+
+    def commit(self) -> None:
+        self.flush()
+
+    def rollback(self) -> None:
+        savepoint = self.info.get("savepoint")
+        if savepoint is not None and savepoint.is_active:
+            savepoint.rollback()
+        else:
+            super().rollback()
+
+
+class WritePipeline:
+    """
+    Single writer thread applying queued crud writes in group commits.
+
+    Every write runs in its own SAVEPOINT, so a failing write is rolled back alone and its caller gets
+    its own error, while the group shares one transaction and one commit. Results are detached from the
+    writer's session before they are handed back. If the group commit itself fails, every write in the
+    group gets that error.
+    """
+
+    def __init__(self, window: float = WRITE_PIPELINE_WINDOW_MS / 1000, max_batch: int = WRITE_PIPELINE_MAX_BATCH,
+                 max_pending: int = WRITE_PIPELINE_MAX_PENDING):
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._session_factory = sessionmaker(class_=GroupSession, autoflush=False, expire_on_commit=False)
+        self._groups = 0
+        self._writes = 0
+        self._rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run `fn(db, *args)` in the next group commit and wait for its result.
+        """
+        self._start()
+        future: Future = Future()
+        # The caller's context travels along, so the request's SQL statements are still counted for it
+        job = (contextvars.copy_context(), fn, args, future)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise HTTPException(status_code=503, detail="Server is busy, try again shortly.",
+                                headers={"Retry-After": "1"})
+        return future.result()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-pipeline", daemon=True)
+                self._thread.start()
+
+    def close(self) -> None:
+        """
+        Finish the queued writes and stop the writer thread.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _next_group(self) -> list | None:
+        first = self._queue.get()
+        if first is None:
+            return None
+        group = [first]
+        deadline = time.monotonic() + self.window
+        while len(group) < self.max_batch:
+            try:
+                job = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if job is None:
+                self._queue.put(None)  # stop once this group is done
+                break
+            group.append(job)
+        return group
+
+    def _run(self) -> None:
+        # A connection of its own for the thread's lifetime, so waiting requests can't starve it out of the pool
+        connection = get_engine().connect()
+        db = self._session_factory(bind=connection)
+        try:
+            while (group := self._next_group()) is not None:
+                try:
+                    self._apply(db, group)
+                except BaseException as error:
+                    # Never leave callers waiting, and start the next group on a clean session
+                    Session.rollback(db)
+                    for *_, future in group:
+                        if not future.done():
+                            future.set_exception(error)
+        finally:
+            db.close()
+            connection.close()
+
+    def _apply(self, db: GroupSession, group: list) -> None:
+        done = []
+        with deferred_invalidation():  # cached entities are only dropped once the group is committed
+            if db.get_bind().dialect.name == "sqlite":
+                # pysqlite doesn't BEGIN before a SAVEPOINT, so each RELEASE would commit its write on its own.
+                # IMMEDIATE also takes the write lock up front instead of upgrading to it halfway through the group.
+                db.execute(text("BEGIN IMMEDIATE"))
+            for context, fn, args, future in group:
+                try:
+                    with db.begin_nested() as savepoint:
+                        db.info["savepoint"] = savepoint
+                        result = context.run(fn, db, *args)
+                    done.append((future, result))
+                except BaseException as error:
+                    future.set_exception(error)
+            db.info.pop("savepoint", None)
+
+            try:
+                Session.commit(db)
+            except BaseException as error:
+                Session.rollback(db)
+                for future, _ in done:
+                    future.set_exception(error)
+                done = []
+            finally:
+                db.expunge_all()
+
+        with self._lock:
+            self._groups += 1
+            self._writes += len(group)
+        for future, result in done:
+            future.set_result(result)
+
+    def metrics(self) -> dict:
+        """
+        Snapshot of the pipeline counters: group commits, writes handled and writes rejected.
+        """
+        with self._lock:
+            return {"groups": self._groups, "writes": self._writes, "rejected": self._rejected}
+
+
+write_pipeline = WritePipeline()
+
+
+def run_write(db: Session, fn: Callable[..., Any], *args) -> Any:
+    """
+    Run a crud write function on the request's session, or through the write pipeline when it is enabled.
+    """
+    if not WRITE_PIPELINE:
+        return fn(db, *args)
+    db.close()  # hand the request's pooled connection back while it waits for the writer
+    return write_pipeline.submit(fn, *args)
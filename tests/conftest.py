@@ -0,0 +1,54 @@
+import os
+import tempfile
+
+# Settings are read at import time, so they are set before anything from the app is imported
+_tmp = tempfile.mkdtemp(prefix="vaultcore-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ["DB_CREATE_SCHEMA"] = "true"
+os.environ["JWT_SECRET_KEY"] = "test-secret-key-0123456789abcdef0123456789"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.database import Session
+from src.models import User, UserRole
+from src.security import hash_password
+
+
+@pytest.fixture(scope="session")
+def client():
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db(client):
+    session = Session()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def create_user(db, username: str, password: str = "password1", role: UserRole = UserRole.USER) -> User:
+    user = User(username=username, password_hash=hash_password(password), email=f"{username}@example.com", role=role)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def login(client, username: str, password: str = "password1") -> dict:
+    response = client.post("/auth/login", json={"username": username, "password": password})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.fixture
+def admin_headers(client, db):
+    username = f"admin{os.urandom(4).hex()}"
+    create_user(db, username, role=UserRole.ADMIN)
+    return {"Authorization": f"Bearer {login(client, username)['access_token']}"}
@@ -0,0 +1,33 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from conftest import create_user, login
+from src.database import get_db
+from src.models import UserRole
+from src.routers import async_techs
+
+
+def no_sync_session():
+    raise AssertionError("async routes must not open a sync session")
+
+
+@pytest.fixture
+def async_client(client):
+    app = FastAPI()
+    app.include_router(async_techs.async_techs_router)
+    app.dependency_overrides[get_db] = no_sync_session
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_async_routes_authenticate_on_the_async_session(client, async_client, db):
+    create_user(db, "asyncadmin", role=UserRole.ADMIN)
+    tokens = login(client, "asyncadmin")
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    response = async_client.post("/techs/", json={"name": "AsyncTech"}, headers=headers)
+    assert response.status_code == 201, response.text
+
+    assert client.post("/auth/logout", headers=headers).status_code == 204
+    assert async_client.post("/techs/", json={"name": "AsyncTech2"}, headers=headers).status_code == 401
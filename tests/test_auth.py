@@ -0,0 +1,67 @@
+import bcrypt
+
+from conftest import create_user, login
+from src import security
+from src.models import RefreshToken
+
+
+def bearer(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def test_login_after_logout(client, db):
+    create_user(db, "relogin")
+    first = login(client, "relogin")
+    assert client.post("/auth/logout", headers=bearer(first)).status_code == 204
+
+    second = login(client, "relogin")
+    assert client.post("/auth/logout", headers=bearer(first)).status_code == 401  # revoked
+    refreshed = client.post("/auth/refresh", json={"refresh_token": second["refresh_token"]})
+    assert refreshed.status_code == 200, refreshed.text
+    assert client.post("/auth/logout", headers=bearer(refreshed.json())).status_code == 204
+
+
+def stored_cost(db, user) -> int:
+    db.refresh(user)
+    return int(user.password_hash.split("$")[2])
+
+
+def test_login_rehashes_only_lower_costs(client, db, monkeypatch):
+    user = create_user(db, "costly")
+    user.password_hash = bcrypt.hashpw(b"password1", bcrypt.gensalt(5)).decode()
+    db.commit()
+    login(client, "costly")
+    assert stored_cost(db, user) == 5  # a worker that calibrated one round higher made it; keep it
+
+    monkeypatch.setattr(security, "_bcrypt_rounds", 6)
+    login(client, "costly")
+    assert stored_cost(db, user) == 6
+
+
+def test_login_rejected_when_password_pool_is_full(client, db, monkeypatch):
+    create_user(db, "crowded")
+    monkeypatch.setattr(security, "password_executor", security.PasswordExecutor(workers=1, max_pending=0))
+    response = client.post("/auth/login", json={"username": "crowded", "password": "password1"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_refresh_tokens_are_stored_as_digests_and_rotate(client, db):
+    create_user(db, "rotating")
+    tokens = login(client, "rotating")
+    assert db.query(RefreshToken).filter(RefreshToken.token == tokens["refresh_token"].encode()).first() is None
+    stored = db.query(RefreshToken).filter(RefreshToken.token == security.hash_refresh_token(tokens["refresh_token"]))
+    assert stored.one().active
+
+    rotated = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert rotated.status_code == 200, rotated.text
+    assert rotated.json()["refresh_token"] != tokens["refresh_token"]
+    db.expire_all()
+    assert not stored.one().active
+
+    reused = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert reused.status_code == 401
+    assert reused.json()["detail"] == "Token revoked"
+    unknown = client.post("/auth/refresh", json={"refresh_token": "never-issued"})
+    assert unknown.status_code == 401
+    assert unknown.json()["detail"] == "Token not found"
@@ -0,0 +1,89 @@
+import gzip
+import json
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from conftest import create_user, login
+from src.database import get_db, get_read_db, init_db
+from src.models import UserRole
+
+
+def ndjson(*records) -> bytes:
+    return b"".join(json.dumps(record).encode() + b"\n" for record in records)
+
+
+def records(body: str) -> set[str]:
+    return {json.dumps(json.loads(line), sort_keys=True) for line in body.splitlines()}
+
+
+def export(client, headers) -> str:
+    response = client.get("/export", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.status_code == 200, response.text
+    assert response.headers["Content-Encoding"] == "gzip"
+    return response.text
+
+
+@pytest.fixture
+def empty_client(client, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    init_db(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    def get_empty_db():
+        with session_factory() as db:
+            yield db
+
+    client.app.dependency_overrides[get_db] = get_empty_db
+    client.app.dependency_overrides[get_read_db] = get_empty_db
+    with session_factory() as db:
+        create_user(db, "importer", role=UserRole.ADMIN)
+    yield client, {"Authorization": f"Bearer {login(client, 'importer')['access_token']}"}
+    client.app.dependency_overrides.clear()
+    engine.dispose()
+
+
+def test_export_import_round_trip(client, admin_headers, request):
+    suffix = os.urandom(4).hex()
+    body = ndjson({"type": "tech", "name": f"RoundTech{suffix}", "description": "exported"},
+                  {"type": "project", "name": f"RoundProject{suffix}", "description": None},
+                  {"type": "link", "project": f"RoundProject{suffix}", "tech": f"RoundTech{suffix}"})
+    response = client.post("/import", content=body, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == {"lines": 3, "techs": {"created": 1, "updated": 0, "conflict": 0},
+                               "projects": {"created": 1, "updated": 0, "conflict": 0},
+                               "links": {"created": 1, "existing": 0, "unknown": 0}}
+    exported = export(client, admin_headers)
+    assert records(body.decode()) <= records(exported)
+
+    empty, headers = request.getfixturevalue("empty_client")
+    response = empty.post("/import", content=gzip.compress(exported.encode()),
+                          headers={**headers, "Content-Encoding": "gzip"})
+    assert response.status_code == 200, response.text
+    assert response.json()["lines"] == len(exported.splitlines())
+    assert records(export(empty, headers)) == records(exported)
+
+    response = empty.post("/import", content=exported, headers=headers)
+    counts = response.json()
+    assert counts["techs"]["created"] == counts["projects"]["created"] == counts["links"]["created"] == 0
+
+
+@pytest.mark.parametrize("body, detail", [
+    (ndjson({"type": "tech", "name": "GoodLine"}) + b"{not json\n", "Line 2: invalid JSON"),
+    (b"\n[1, 2]\n", "Line 2: expected a JSON object"),
+    (ndjson({"type": "widget"}), "Line 1: unknown record type 'widget'"),
+    (ndjson({"type": "tech"}), "Line 1: name: Field required"),
+    (ndjson({"type": "link", "project": "Vault"}), "Line 1: link records need 'project' and 'tech' names"),
+])
+def test_import_rejects_bad_lines(client, admin_headers, body, detail):
+    response = client.post("/import", content=body, headers=admin_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+
+
+def test_import_rejects_bad_gzip(client, admin_headers):
+    response = client.post("/import", content=b"not gzip", headers={**admin_headers, "Content-Encoding": "gzip"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Request body is not valid gzip"
@@ -0,0 +1,64 @@
+from sqlalchemy import func, select
+
+from src.commands import rebuild_change_log
+from src.models import CatalogChange, Tech
+from src.pagination import NEXT_CURSOR_HEADER
+
+
+def latest_version(db) -> int:
+    return db.scalar(select(func.coalesce(func.max(CatalogChange.version), 0)))
+
+
+def create(client, headers, path: str, name: str) -> int:
+    response = client.post(path, json={"name": name}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["tech_id" if path == "/techs/" else "project_id"]
+
+
+def test_changes_keep_latest_state_and_tombstones(client, db, admin_headers):
+    since = latest_version(db)
+    tech_id = create(client, admin_headers, "/techs/", "ChangeTech")
+    project_id = create(client, admin_headers, "/projects/", "ChangeProject")
+    assert client.put(f"/projects/{project_id}/techs", json=[tech_id], headers=admin_headers).status_code == 200
+    assert client.patch(f"/techs/{tech_id}", json={"name": "ChangeTech2"}, headers=admin_headers).status_code == 200
+    assert client.put(f"/projects/{project_id}/techs?mode=remove", json=[tech_id],
+                      headers=admin_headers).status_code == 200
+    assert client.delete(f"/projects/{project_id}", headers=admin_headers).status_code == 204
+
+    changes = client.get("/changes", params={"since": since}).json()
+    assert [(change["type"], change["op"], change["id"], change["tech_id"], change["name"]) for change in changes] == [
+        ("tech", "upsert", tech_id, None, "ChangeTech2"),
+        ("link", "unlink", project_id, tech_id, None),
+        ("project", "delete", project_id, None, None),
+    ]
+    assert [change["version"] for change in changes] == sorted(change["version"] for change in changes)
+
+
+def test_changes_cursor_pages_through_everything(client, db, admin_headers):
+    since = latest_version(db)
+    tech_ids = [create(client, admin_headers, "/techs/", f"CursorTech{i}") for i in range(3)]
+
+    first = client.get("/changes", params={"since": since, "limit": 2})
+    assert [change["id"] for change in first.json()] == tech_ids[:2]
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+    assert int(cursor) == first.json()[-1]["version"]
+
+    second = client.get("/changes", params={"since": cursor, "limit": 2})
+    assert [change["id"] for change in second.json()] == tech_ids[2:]
+    assert NEXT_CURSOR_HEADER not in second.headers
+
+    streamed = client.get("/changes", params={"since": since, "stream": True}).json()
+    assert streamed == first.json() + second.json()
+
+
+def test_rebuild_change_log_backfills_and_keeps_tombstones(client, db, admin_headers):
+    deleted_id = create(client, admin_headers, "/techs/", "RebuildGone")
+    assert client.delete(f"/techs/{deleted_id}", headers=admin_headers).status_code == 204
+
+    rebuild_change_log(db)
+
+    changes = client.get("/changes", params={"stream": True}).json()
+    upserts = {change["id"]: change["version"] for change in changes if change["type"] == "tech"
+               and change["op"] == "upsert"}
+    assert upserts == dict(db.execute(select(Tech.tech_id, Tech.change_version)).all())
+    assert ("tech", "delete", deleted_id) in {(change["type"], change["op"], change["id"]) for change in changes}
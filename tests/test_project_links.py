@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from conftest import create_user, login
+
+UNKNOWN_TECH_ID = 10 ** 9
+
+
+@pytest.fixture
+def catalog(client, admin_headers):
+    suffix = os.urandom(4).hex()
+    tech_ids = []
+    for name in ("LinkTechA", "LinkTechB", "LinkTechC"):
+        response = client.post("/techs/", json={"name": f"{name}{suffix}"}, headers=admin_headers)
+        assert response.status_code == 201, response.text
+        tech_ids.append(response.json()["tech_id"])
+    response = client.post("/projects/", json={"name": f"LinkProject{suffix}"}, headers=admin_headers)
+    assert response.status_code == 201, response.text
+    return response.json()["project_id"], tech_ids
+
+
+def link(client, headers, project_id: int, tech_ids: list[int], mode: str) -> dict:
+    response = client.put(f"/projects/{project_id}/techs", params={"mode": mode}, json=tech_ids, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def outcome(result: dict) -> tuple:
+    return (result["added_tech_ids"], result["removed_tech_ids"], result["unknown_tech_ids"],
+            sorted(tech["tech_id"] for tech in result["techs"]))
+
+
+def test_link_modes(client, admin_headers, catalog):
+    project_id, (a, b, c) = catalog
+
+    assert outcome(link(client, admin_headers, project_id, [a, b, UNKNOWN_TECH_ID], "add")) == \
+        ([a, b], [], [UNKNOWN_TECH_ID], [a, b])
+    assert outcome(link(client, admin_headers, project_id, [a], "add")) == ([], [], [], [a, b])
+    assert outcome(link(client, admin_headers, project_id, [b, c, UNKNOWN_TECH_ID], "replace")) == \
+        ([c], [a], [UNKNOWN_TECH_ID], [b, c])
+    assert outcome(link(client, admin_headers, project_id, [a, b, UNKNOWN_TECH_ID], "remove")) == \
+        ([], [b], [UNKNOWN_TECH_ID], [c])
+    assert outcome(link(client, admin_headers, project_id, [], "replace")) == ([], [c], [], [])
+
+
+def test_link_errors(client, db, admin_headers, catalog):
+    project_id, tech_ids = catalog
+    response = client.put("/projects/999999999/techs", json=tech_ids, headers=admin_headers)
+    assert response.status_code == 404
+    response = client.put(f"/projects/{project_id}/techs", params={"mode": "merge"}, json=tech_ids,
+                          headers=admin_headers)
+    assert response.status_code == 422
+
+    create_user(db, "linkviewer")
+    headers = {"Authorization": f"Bearer {login(client, 'linkviewer')['access_token']}"}
+    assert client.put(f"/projects/{project_id}/techs", json=tech_ids, headers=headers).status_code == 403
@@ -0,0 +1,49 @@
+from sqlalchemy import event, func, select
+
+from src.crud import read_all_project, read_project_rows
+from src.database import get_engine
+from src.models import Project, Tech
+
+
+def add_projects(db, prefix: str, count: int) -> int:
+    """
+    Add `count` projects linked to two techs each and return the ID right before the first one.
+    """
+    after = db.scalar(select(func.coalesce(func.max(Project.project_id), 0)))
+    techs = [Tech(name=f"{prefix}-tech-{i}") for i in range(count + 1)]
+    db.add_all(Project(name=f"{prefix}-project-{i}", techs=techs[i:i + 2]) for i in range(count))
+    db.commit()
+    db.expunge_all()
+    return after
+
+def count_statements(fn) -> int:
+    statements = []
+    def count(*args):
+        statements.append(args[2])
+
+    event.listen(get_engine(), "before_cursor_execute", count)
+    try:
+        fn()
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", count)
+    return len(statements)
+
+
+def test_read_all_project_query_count_is_constant(db):
+    def read(after: int, count: int):
+        projects = read_all_project(db, limit=count, after=after)
+        assert [len(project.techs) for project in projects] == [2] * count
+        db.expunge_all()
+
+    few = add_projects(db, "orm-few", 3)
+    many = add_projects(db, "orm-many", 30)
+    assert count_statements(lambda: read(few, 3)) == count_statements(lambda: read(many, 30))
+
+def test_read_project_rows_query_count_is_constant(db):
+    def read(after: int, count: int):
+        projects = read_project_rows(db, limit=count, after=after)
+        assert [len(project["techs"]) for project in projects] == [2] * count
+
+    few = add_projects(db, "rows-few", 3)
+    many = add_projects(db, "rows-many", 30)
+    assert count_statements(lambda: read(few, 3)) == count_statements(lambda: read(many, 30))
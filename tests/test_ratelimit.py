@@ -0,0 +1,47 @@
+import pytest
+from fastapi import HTTPException
+
+from src.ratelimit import MemoryRateLimitStorage, RateLimiter, RateLimitStorage, auth_rate_limiter
+
+
+def test_memory_storage_refills_buckets():
+    storage = MemoryRateLimitStorage()
+    assert [storage.take("key", 2, 1.0, now=0) for _ in range(3)] == [0, 0, 1.0]
+    assert storage.take("key", 2, 1.0, now=0.5) == pytest.approx(0.5)
+    assert storage.take("key", 2, 1.0, now=1.5) == 0
+
+
+def test_memory_storage_drops_least_recently_used_buckets():
+    storage = MemoryRateLimitStorage(max_keys=1)
+    assert storage.take("first", 1, 1.0, now=0) == 0
+    assert storage.take("second", 1, 1.0, now=0) == 0
+    assert storage.take("first", 1, 1.0, now=0) == 0  # dropped, so full again
+
+
+def test_custom_storage():
+    with pytest.raises(TypeError):
+        RateLimitStorage()
+
+    class AlwaysEmpty(RateLimitStorage):
+        def take(self, key, capacity, refill_rate, now):
+            return 2.5
+
+    limiter = RateLimiter(AlwaysEmpty(), enabled=True)
+    limiter.configure("test", "1/1")
+    with pytest.raises(HTTPException) as excinfo:
+        limiter.hit("test", "key")
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.headers == {"Retry-After": "3"}
+    assert limiter.metrics() == {"test": 1}
+
+
+def test_login_answers_429_with_retry_after(client, monkeypatch):
+    monkeypatch.setattr(auth_rate_limiter, "enabled", True)
+    monkeypatch.setattr(auth_rate_limiter, "storage", MemoryRateLimitStorage())
+    credentials = {"username": "throttled", "password": "wrong-password"}
+
+    for _ in range(5):  # AUTH_LOGIN_RATE_PER_USERNAME defaults to 5/60
+        assert client.post("/auth/login", json=credentials).status_code == 401
+    response = client.post("/auth/login", json=credentials)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "12"
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from src.commands import refresh_tokens_need_upgrade, upgrade_refresh_tokens
+from src.database import get_db, get_read_db, init_db
+from src.security import hash_password, hash_refresh_token
+
+# Schema of a database created by the first release, before any upgrade
+BASELINE_SCHEMA = """
+CREATE TABLE techs (
+    tech_id INTEGER NOT NULL, name VARCHAR(50) NOT NULL, description VARCHAR,
+    PRIMARY KEY (tech_id), UNIQUE (name)
+);
+CREATE INDEX ix_techs_tech_id ON techs (tech_id);
+CREATE TABLE projects (
+    project_id INTEGER NOT NULL, name VARCHAR(100) NOT NULL, description VARCHAR,
+    PRIMARY KEY (project_id), UNIQUE (name)
+);
+CREATE INDEX ix_projects_project_id ON projects (project_id);
+CREATE TABLE users (
+    user_id INTEGER NOT NULL, username VARCHAR(50) NOT NULL, password_hash VARCHAR(250) NOT NULL,
+    email VARCHAR(100) NOT NULL, role VARCHAR(6) DEFAULT 'UserRole.USER' NOT NULL,
+    PRIMARY KEY (user_id), UNIQUE (username), UNIQUE (email)
+);
+CREATE INDEX ix_users_user_id ON users (user_id);
+CREATE TABLE project_techs (
+    project_id INTEGER NOT NULL, tech_id INTEGER NOT NULL, PRIMARY KEY (project_id, tech_id),
+    FOREIGN KEY(project_id) REFERENCES projects (project_id), FOREIGN KEY(tech_id) REFERENCES techs (tech_id)
+);
+CREATE TABLE refresh_tokens (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, token VARCHAR(250) NOT NULL, created_at DATETIME NOT NULL,
+    expires_at DATETIME NOT NULL, active BOOLEAN NOT NULL,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (user_id)
+);
+CREATE INDEX ix_refresh_tokens_token ON refresh_tokens (token);
+CREATE INDEX ix_refresh_tokens_id ON refresh_tokens (id);
+"""
+# Refresh tokens used to be stored as they were handed out
+PLAIN_REFRESH_TOKEN = "8b0f7ab4-3c4e-4f5e-9d7a-2f1d3c9e6a10"
+
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA.split(";"):
+            if statement.strip():
+                connection.execute(text(statement))
+        connection.execute(text("INSERT INTO users (username, password_hash, email, role) "
+                                "VALUES ('veteran', :password_hash, 'veteran@example.com', 'ADMIN')"),
+                           {"password_hash": hash_password("password1")})
+        connection.execute(text("INSERT INTO refresh_tokens (user_id, token, created_at, expires_at, active) "
+                                "VALUES (1, :token, :now, :expires_at, 1)"),
+                           {"token": PLAIN_REFRESH_TOKEN, "now": datetime.now(timezone.utc),
+                            "expires_at": datetime.now(timezone.utc) + timedelta(days=1)})
+        connection.execute(text("INSERT INTO techs (name) VALUES ('Python'), ('Rust')"))
+        connection.execute(text("INSERT INTO projects (name) VALUES ('Vault'), ('Core')"))
+        connection.execute(text("INSERT INTO project_techs VALUES (1, 1), (2, 1), (2, 2)"))
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def upgraded_client(client, baseline_engine):
+    init_db(baseline_engine)
+    session_factory = sessionmaker(bind=baseline_engine, autoflush=False)
+
+    def get_baseline_db():
+        with session_factory() as db:
+            yield db
+
+    client.app.dependency_overrides[get_db] = get_baseline_db
+    client.app.dependency_overrides[get_read_db] = get_baseline_db
+    yield client
+    client.app.dependency_overrides.clear()
+
+
+def test_upgrade_adds_new_columns(baseline_engine):
+    assert init_db(baseline_engine) == ["rebuild_tech_counts", "rebuild_change_log", "upgrade_refresh_tokens"]
+    assert init_db(baseline_engine) == []  # a second run finds nothing to do
+
+    columns = {table: {column["name"] for column in inspect(baseline_engine).get_columns(table)}
+               for table in ("users", "techs", "projects")}
+    assert "token_version" in columns["users"]
+    assert {"change_version", "project_count"} <= columns["techs"]
+    assert "change_version" in columns["projects"]
+
+def test_login_after_upgrade(upgraded_client):
+    response = upgraded_client.post("/auth/login", json={"username": "veteran", "password": "password1"})
+    assert response.status_code == 200, response.text
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    created = upgraded_client.post("/techs/", json={"name": "Upgraded"}, headers=headers)
+    assert created.status_code == 201, created.text
+    assert upgraded_client.post("/auth/logout", headers=headers).status_code == 204
+
+def test_upgrade_fills_in_new_columns(upgraded_client):
+    popular = upgraded_client.get("/techs/popular").json()
+    assert [(tech["name"], tech["project_count"]) for tech in popular] == [("Python", 2), ("Rust", 1)]
+
+    changes = upgraded_client.get("/changes").json()
+    assert {(change["type"], change["id"]) for change in changes} == {
+        ("tech", 1), ("tech", 2), ("project", 1), ("project", 2), ("link", 1), ("link", 2)}
+
+def test_refresh_token_survives_upgrade(upgraded_client):
+    response = upgraded_client.post("/auth/refresh", json={"refresh_token": PLAIN_REFRESH_TOKEN})
+    assert response.status_code == 200, response.text
+
+def test_upgrade_refresh_tokens_stores_digests(baseline_engine):
+    tokens = [PLAIN_REFRESH_TOKEN] + [f"plain-token-{i}" for i in range(4)]
+    with baseline_engine.begin() as connection:
+        connection.execute(text("INSERT INTO refresh_tokens (user_id, token, created_at, expires_at, active) "
+                                "VALUES (1, :token, :now, :now, 0)"),
+                           [{"token": token, "now": datetime.now(timezone.utc)} for token in tokens[1:]])
+
+    with sessionmaker(bind=baseline_engine)() as db:
+        upgrade_refresh_tokens(db, batch_size=2)
+        assert not refresh_tokens_need_upgrade(baseline_engine)
+        upgrade_refresh_tokens(db)  # a second run finds nothing to do
+
+    with baseline_engine.connect() as connection:
+        stored = connection.execute(text("SELECT token FROM refresh_tokens")).scalars().all()
+    assert sorted(stored) == sorted(hash_refresh_token(token) for token in tokens)
@@ -0,0 +1,81 @@
+import contextvars
+from concurrent.futures import Future
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.crud import create_tech, update_tech
+from src.database import Session as DatabaseSession, get_engine
+from src.models import Tech
+from src.schemas import TechCreateSchema, TechUpdateSchema
+from src.writes import WritePipeline
+
+
+def make_group(*calls) -> list:
+    return [(contextvars.copy_context(), fn, args, Future()) for fn, *args in calls]
+
+def count_techs(names: list[str]) -> int:
+    with DatabaseSession() as other:  # a separate connection only sees committed writes
+        return other.scalar(select(func.count()).where(Tech.name.in_(names)))
+
+def apply_group(group: list) -> None:
+    pipeline = WritePipeline()
+    with get_engine().connect() as connection:
+        db = pipeline._session_factory(bind=connection)
+        try:
+            pipeline._apply(db, group)
+        finally:
+            db.close()
+
+
+def test_group_is_committed_once(client):
+    names = ["grouped-1", "grouped-2", "grouped-3"]
+    visible = []
+    group = make_group(*[(create_tech, TechCreateSchema(name=name)) for name in names],
+                       (lambda db: visible.append(count_techs(names)),))
+    apply_group(group)
+
+    assert visible == [0]  # nothing was committed while the group was still running
+    assert count_techs(names) == 3
+    assert all(future.exception() is None for *_, future in group)
+
+def test_failing_write_is_rolled_back_alone(client):
+    group = make_group((create_tech, TechCreateSchema(name="alone-1")),
+                       (create_tech, TechCreateSchema(name="alone-1")),  # duplicate name
+                       (create_tech, TechCreateSchema(name="alone-2")))
+    apply_group(group)
+
+    assert [future.exception() is None for *_, future in group] == [True, False, True]
+    assert count_techs(["alone-1", "alone-2"]) == 2
+
+def test_failed_group_commit_rolls_back_every_write(client, monkeypatch):
+    def failing_commit(self):
+        raise RuntimeError("commit failed")
+
+    group = make_group((create_tech, TechCreateSchema(name="uncommitted-1")),
+                       (create_tech, TechCreateSchema(name="uncommitted-2")))
+    monkeypatch.setattr(Session, "commit", failing_commit)
+    apply_group(group)
+    monkeypatch.undo()
+
+    for *_, future in group:
+        with pytest.raises(RuntimeError):
+            future.result()
+    assert count_techs(["uncommitted-1", "uncommitted-2"]) == 0
+
+def test_cache_is_dropped_after_the_group_commits(client, admin_headers):
+    tech_id = client.post("/techs/", json={"name": "cached-tech"}, headers=admin_headers).json()["tech_id"]
+    project_id = client.post("/projects/", json={"name": "cached-project"}, headers=admin_headers).json()["project_id"]
+    client.put(f"/projects/{project_id}/techs", json=[tech_id], headers=admin_headers)
+    assert client.get(f"/projects/{project_id}").json()["techs"][0]["name"] == "cached-tech"
+
+    cached = []
+    def read_project(db):
+        # A read landing between the write and the group commit still gets the cached project
+        cached.append(client.get(f"/projects/{project_id}").json()["techs"][0]["name"])
+
+    apply_group(make_group((update_tech, tech_id, TechUpdateSchema(name="renamed-tech")), (read_project,)))
+
+    assert cached == ["cached-tech"]
+    assert client.get(f"/projects/{project_id}").json()["techs"][0]["name"] == "renamed-tech"